@@ -0,0 +1,75 @@
+# Compares the BeautifulSoup and lxml/XPath parser backends on saved Justdial pages.
+# Usage: python benchmark_parser.py [dir with saved .html pages, or a scrape_archive/] [--repeat N] [--check]
+# Without a directory it uses the Justdial-shaped pages in fixtures/pages (built from the
+# restaurants in ../public/scraped_data); --check only verifies both backends agree, offline.
+import argparse
+import os
+import sys
+import time
+
+from scraper import FastRestaurantScraper, ResponseArchive, RestaurantScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def extract(scraper, html):
+    """Everything create_restaurant_json puts in the JSON, minus the timestamp and the file write"""
+    doc = scraper.parse(html)
+    basic_info = {}
+    scraper.extract_basic_info(doc, basic_info)
+    return {"basic_info": basic_info, "menu": scraper.extract_menu(doc)}
+
+
+def benchmark(scraper, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages.values():
+            extract(scraper, html)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper parser backends")
+    parser.add_argument(
+        "fixtures", nargs="?", default=FIXTURES,
+        help="directory of saved restaurant pages (*.html) or a recorded archive (*.gz); default: fixtures/pages",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="only check that both backends produce identical JSON")
+    args = parser.parse_args()
+
+    pages = {}
+    for name in sorted(os.listdir(args.fixtures)):
+        if name.endswith(".html"):
+            with open(os.path.join(args.fixtures, name), encoding="utf-8") as f:
+                pages[name] = f.read()
+    if any(name.endswith(".gz") for name in os.listdir(args.fixtures)):
+        archive = ResponseArchive(args.fixtures)
+        for url in archive.urls():
+            pages[url] = archive.load(url).text
+    if not pages:
+        raise SystemExit(f"No .html files in {args.fixtures}")
+
+    soup, fast = RestaurantScraper(), FastRestaurantScraper()
+
+    # both backends must produce the same JSON before their speed means anything
+    mismatches = [name for name, html in pages.items() if extract(soup, html) != extract(fast, html)]
+    for name in mismatches:
+        print(f"✗ Output differs for {name}")
+    print(f"{len(pages) - len(mismatches)}/{len(pages)} pages parse identically\n")
+    if args.check:
+        sys.exit(1 if mismatches else 0)
+
+    items = sum(len(v) for html in pages.values() for v in extract(fast, html)["menu"].values())
+    results = {}
+    for label, scraper in (("BeautifulSoup", soup), ("lxml/XPath", fast)):
+        elapsed = benchmark(scraper, pages, args.repeat)
+        n = len(pages) * args.repeat
+        results[label] = elapsed
+        print(f"{label:14s} {elapsed / n * 1000:8.2f} ms/page  {n / elapsed:8.1f} pages/sec  "
+              f"{items * args.repeat / elapsed:10.0f} items/sec")
+    print(f"\nSpeedup: {results['BeautifulSoup'] / results['lxml/XPath']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
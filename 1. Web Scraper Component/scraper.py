@@ -1,7 +1,20 @@
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from lxml import etree
+import lxml.html
 import json
+import gzip
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import threading
+import multiprocessing
+import queue
+import hashlib
+import time
 import os
 
 # This class is responsible for scraping restaurant data from Justdial
@@ -52,8 +65,8 @@ class RestaurantScraper:
             menu_dict[category] = items
         return menu_dict
 
-    def create_restaurant_json(self, soup, url):
-        """Create a complete restaurant data JSON with all scraped information"""
+    def build_restaurant_json(self, soup, url):
+        """Assemble the restaurant data JSON from a parsed page; raises if the page can't be read"""
         restaurant_data = {
             "scrape_metadata": {
                 "scrape_url": url,
@@ -71,53 +84,75 @@ class RestaurantScraper:
             "menu": {}
         }
         
+        self.extract_basic_info(soup, restaurant_data["basic_info"])
+        if restaurant_data["basic_info"]["name"] is None:
+            raise ValueError("restaurant name not found on page")
+        
+        # Menu (using existing extract_menu function)
+        menu_data = self.extract_menu(soup)
+        if menu_data:
+            restaurant_data["menu"] = menu_data
+        return restaurant_data
+
+    @staticmethod
+    def restaurant_filename(restaurant_data, output_dir='scraped_data'):
+        return f"{output_dir}/{restaurant_data['basic_info']['name']}.json"
+
+    def save_restaurant_json(self, restaurant_data, output_dir='scraped_data'):
+        """Write the restaurant JSON in one go; readers never see a half-written file"""
+        filename = self.restaurant_filename(restaurant_data, output_dir)
+        tmp = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(restaurant_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, filename)
+        return filename
+
+    def create_restaurant_json(self, soup, url, contact_no=None):
+        """Create a complete restaurant data JSON with all scraped information"""
         try:
-            # Basic Info
-            name_elem = soup.find('div', class_='compney')
-            if name_elem:
-                restaurant_data["basic_info"]["name"] = name_elem.text.strip()
-                
-            rating_elem = soup.find('div', class_='vendbox_rateavg')
-            if rating_elem:
-                restaurant_data["basic_info"]["rating"] = float(rating_elem.text.strip())
-                
-            rate_count_elem = soup.find('div', class_='vendbox_ratecount')
-            if rate_count_elem:
-                restaurant_data["basic_info"]["rating_count"] = rate_count_elem.text.split(' ')[0]
-                
-            address_elem = soup.find('div', class_='adress').find_next('a')
-            if address_elem:
-                restaurant_data["basic_info"]["address"] = address_elem.text.strip()
-            
-            # Contact
-            restaurant_data["basic_info"]["contact"] = "07947114254"  # As given in the notebook
-            
-            # Operating Hours
-            hours_elem = soup.find_all('div', class_='operation')
-            if len(hours_elem) > 1:
-                restaurant_data["basic_info"]["operating_hours"] = hours_elem[1].text.strip()
-                
-            # Special Info
-            special_info_elem = soup.find_all('div', 'adress font14 fw100 color111')
-            if len(special_info_elem) > 1:
-                restaurant_data["basic_info"]["special_info"] = special_info_elem[1].text.strip()
-            
-            # Menu (using existing extract_menu function)
-            menu_data = self.extract_menu(soup)
-            if menu_data:
-                restaurant_data["menu"] = menu_data
-                
-            # Save to JSON file
-            filename = f"scraped_data/{name_elem.text.strip()}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(restaurant_data, f, indent=2, ensure_ascii=False)
-                
+            restaurant_data = self.build_restaurant_json(soup, url)
+            if contact_no:
+                restaurant_data["basic_info"]["contact"] = contact_no
+            self.save_restaurant_json(restaurant_data)
             return restaurant_data
             
         except Exception as e:
             print(f"Error creating restaurant JSON: {str(e)}")
             return None
 
+    def extract_basic_info(self, soup, basic_info):
+        name_elem = soup.find('div', class_='compney')
+        if name_elem:
+            basic_info["name"] = name_elem.text.strip()
+            
+        rating_elem = soup.find('div', class_='vendbox_rateavg')
+        if rating_elem:
+            basic_info["rating"] = float(rating_elem.text.strip())
+            
+        rate_count_elem = soup.find('div', class_='vendbox_ratecount')
+        if rate_count_elem:
+            basic_info["rating_count"] = rate_count_elem.text.split(' ')[0]
+            
+        address_elem = soup.find('div', class_='adress').find_next('a')
+        if address_elem:
+            basic_info["address"] = address_elem.text.strip()
+        
+        # Contact
+        basic_info["contact"] = "07947114254"  # As given in the notebook
+        
+        # Operating Hours
+        hours_elem = soup.find_all('div', class_='operation')
+        if len(hours_elem) > 1:
+            basic_info["operating_hours"] = hours_elem[1].text.strip()
+            
+        # Special Info
+        special_info_elem = soup.find_all('div', 'adress font14 fw100 color111')
+        if len(special_info_elem) > 1:
+            basic_info["special_info"] = special_info_elem[1].text.strip()
+
+    def parse(self, html):
+        return BeautifulSoup(html, 'lxml')
+
 
     def scrape_restaurant(self, url):
         def get_headers():
@@ -133,7 +168,7 @@ class RestaurantScraper:
         response.raise_for_status()
 
         # Parse HTML
-        soup = BeautifulSoup(response.text, 'lxml')
+        soup = self.parse(response.text)
 
         # call the scraper
         restaurant_data = self.create_restaurant_json(soup, url)
@@ -142,15 +177,298 @@ class RestaurantScraper:
         else:
             print("Failed to scrape restaurant data.")
 
+def _has_class(name):
+    """XPath predicate equivalent to BeautifulSoup's class_=name (one of the element's classes)"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Same output as RestaurantScraper, but skips building a BeautifulSoup tree: the page is parsed
+# straight into an lxml tree and queried with precompiled XPath expressions
+class FastRestaurantScraper(RestaurantScraper):
+    NAME = etree.XPath(f"(//div[{_has_class('compney')}])[1]")
+    RATING = etree.XPath(f"(//div[{_has_class('vendbox_rateavg')}])[1]")
+    RATING_COUNT = etree.XPath(f"(//div[{_has_class('vendbox_ratecount')}])[1]")
+    ADDRESS = etree.XPath(f"(//div[{_has_class('adress')}])[1]")
+    # find_next('a'): the first <a> after the start of the element, its own descendants included
+    NEXT_LINK = etree.XPath("(descendant::a | following::a)[1]")
+    HOURS = etree.XPath(f"//div[{_has_class('operation')}]")
+    SPECIAL_INFO = etree.XPath("//div[@class='adress font14 fw100 color111']")
+    SECTIONS = etree.XPath(f"//div[{_has_class('accordion_collapse')}]")
+    ITEMS = etree.XPath(f".//div[{_has_class('service_preview')}]")
+    ITEM_NAME = etree.XPath(f"(.//div[{_has_class('service_name')}])[1]")
+    ITEM_LINK = etree.XPath("(.//a)[1]")
+    ITEM_PRICE = etree.XPath(f"(.//div[{_has_class('service_priceoffer')}])[1]")
+    VEG = etree.XPath("boolean(.//img[@alt='Veg'])")
+    NON_VEG = etree.XPath("boolean(.//img[@alt='Non Veg'])")
+
+    @staticmethod
+    def first(xpath, node):
+        found = xpath(node)
+        return found[0] if found else None
+
+    def parse(self, html):
+        return lxml.html.document_fromstring(html)
+
+    def extract_basic_info(self, tree, basic_info):
+        name_elem = self.first(self.NAME, tree)
+        if name_elem is not None:
+            basic_info["name"] = name_elem.text_content().strip()
+
+        rating_elem = self.first(self.RATING, tree)
+        if rating_elem is not None:
+            basic_info["rating"] = float(rating_elem.text_content().strip())
+
+        rate_count_elem = self.first(self.RATING_COUNT, tree)
+        if rate_count_elem is not None:
+            basic_info["rating_count"] = rate_count_elem.text_content().split(' ')[0]
+
+        address_div = self.first(self.ADDRESS, tree)
+        if address_div is None:
+            raise ValueError("address not found on page")
+        address_elem = self.first(self.NEXT_LINK, address_div)
+        if address_elem is not None:
+            basic_info["address"] = address_elem.text_content().strip()
+
+        basic_info["contact"] = "07947114254"  # As given in the notebook
+
+        hours_elem = self.HOURS(tree)
+        if len(hours_elem) > 1:
+            basic_info["operating_hours"] = hours_elem[1].text_content().strip()
+
+        special_info_elem = self.SPECIAL_INFO(tree)
+        if len(special_info_elem) > 1:
+            basic_info["special_info"] = special_info_elem[1].text_content().strip()
+
+    def extract_menu(self, tree):
+        menu_dict = {}
+        for section in self.SECTIONS(tree):
+            category = section.get('aria-labelledby', 'Unknown')
+            items = []
+            for item in self.ITEMS(section):
+                try:
+                    item_data = {
+                        "name": None,
+                        "price": None,
+                        "veg_status": None
+                    }
+                    name_elem = self.first(self.ITEM_NAME, item)
+                    if name_elem is not None:
+                        link = self.first(self.ITEM_LINK, name_elem)
+                        item_data["name"] = (link if link is not None else name_elem).text_content().strip()
+
+                    price_elem = self.first(self.ITEM_PRICE, item)
+                    if price_elem is not None:
+                        price_text = price_elem.text_content().strip()
+                        item_data["price"] = int(price_text.split('₹')[1].strip())
+
+                    if self.VEG(item):
+                        item_data["veg_status"] = "veg"
+                    elif self.NON_VEG(item):
+                        item_data["veg_status"] = "non-veg"
+
+                    if item_data["name"]:
+                        items.append(item_data)
+
+                except Exception as e:
+                    print(f"Error processing item: {str(e)}")
+                    continue
+
+            menu_dict[category] = items
+        return menu_dict
+
+
+# Keeps requests to the same host at least `min_interval` seconds apart across all threads
+class HostRateLimiter:
+    def __init__(self, requests_per_second=1.0):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to url's host is allowed"""
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Raw responses saved during a crawl, one gzip file per URL, so pages can be re-parsed offline.
+# Each file holds a JSON header line (url, status, headers, encoding, fetch time) followed by the raw body.
+class ResponseArchive:
+    def __init__(self, path='scrape_archive'):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def file_for(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.gz')
+
+    def save(self, response, url):
+        header = {
+            "url": url,
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "fetched_at": datetime.now().isoformat(),
+        }
+        filename = self.file_for(url)
+        tmp = f"{filename}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.write(response.content)
+        os.replace(tmp, filename)
+
+    def load(self, url):
+        """The archived page for url as a requests.Response; KeyError if it was never recorded"""
+        filename = self.file_for(url)
+        if not os.path.exists(filename):
+            raise KeyError(f"{url} is not in the archive {self.path}")
+        with gzip.open(filename, 'rb') as f:
+            header, _, body = f.read().partition(b'\n')
+        header = json.loads(header)
+        response = requests.Response()
+        response.url = header["url"]
+        response.status_code = header["status_code"]
+        response.headers = CaseInsensitiveDict(header["headers"])
+        response.encoding = header["encoding"]
+        response._content = body
+        return response
+
+    def urls(self):
+        """Every URL in the archive"""
+        urls = []
+        for name in sorted(os.listdir(self.path)):
+            if name.endswith('.gz'):
+                with gzip.open(os.path.join(self.path, name), 'rb') as f:
+                    urls.append(json.loads(f.readline())["url"])
+        return urls
+
+
+# Consolidated dataset: every restaurant as one compact JSON line in a single file, which the
+# Vectorizer can stream instead of opening thousands of per-restaurant files. Lines are only
+# ever appended; compact() keeps the newest line per scrape URL.
+class DatasetWriter:
+    def __init__(self, path='scraped_data.jsonl'):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, restaurant_data):
+        line = json.dumps(restaurant_data, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+        return self.path
+
+    def compact(self):
+        """Rewrite the dataset (atomically) with only the latest record for each restaurant URL"""
+        if not os.path.exists(self.path):
+            return 0
+        with self.lock:
+            latest = {}
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        latest[json.loads(line)["scrape_metadata"]["scrape_url"]] = line
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(latest.values())
+            os.replace(tmp, self.path)
+        return len(latest)
+
+
+PARSERS = {'lxml': FastRestaurantScraper, 'soup': RestaurantScraper}
+_parsers = {}
+
+def parse_page(html, url, parser='lxml'):
+    """Build the restaurant JSON for one page without writing it: (restaurant_data, error, seconds).
+    Runs in the pipeline's worker processes, so it has to stay a picklable top-level function."""
+    start = time.perf_counter()
+    if parser not in _parsers:
+        _parsers[parser] = PARSERS[parser]()
+    scraper = _parsers[parser]
+    try:
+        return scraper.build_restaurant_json(scraper.parse(html), url), None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+
+# Work done, time spent working and time blocked on a full downstream queue by one pipeline stage
+class StageMetrics:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.count = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.max_queue = 0
+        self.lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, count=1, queue_depth=0):
+        with self.lock:
+            self.count += count
+            self.busy += busy
+            self.blocked += blocked
+            self.max_queue = max(self.max_queue, queue_depth)
+
+    def report(self, elapsed):
+        per_item = self.busy / self.count * 1000 if self.count else 0.0
+        utilisation = self.busy / (elapsed * self.workers) * 100 if elapsed else 0.0
+        return (f"{self.name:6s} x{self.workers:<3d} {self.count:5d} pages  {per_item:8.1f} ms/page  "
+                f"{utilisation:5.1f}% busy  {self.blocked:6.2f}s blocked downstream  max queue {self.max_queue}")
+
+
 # This class helps to interact with the above class by using two modes.
 # 1. Interactive Mode: For scraping a single restaurant provided by the user
-# 2. Update Mode: For scraping multiple restaurants from a list
+# 2. Update Mode: For scraping multiple restaurants from a list, concurrently
+# Either mode can record every fetched page to a ResponseArchive (record=True) or read pages
+# back from one instead of the network (replay=True), which also skips rate limiting.
+# Replays write everything under output_root (replay_output/ by default) instead of the working
+# directory, so re-parsing an archive never overwrites the real scraped_data/, dataset or state.
 class RunningModes:
-    def __init__(self):
-        self.scraper = RestaurantScraper()
+    def __init__(self, workers=4, requests_per_second=1.0, retries=3, backoff=1.0, timeout=30, parser='lxml',
+                 archive_path='scrape_archive', record=False, replay=False, output='files', dataset_path='scraped_data.jsonl',
+                 output_root=None):
+        # 'lxml' uses the XPath-based FastRestaurantScraper, 'soup' the original BeautifulSoup one
+        self.parser = parser if parser in PARSERS else 'soup'
+        self.scraper = PARSERS[self.parser]()
+        self.workers = workers
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.session = self.create_session(retries, backoff)
+        self.output_root = output_root if output_root is not None else ('replay_output' if replay else '')
+        self.output_dir = os.path.join(self.output_root, 'scraped_data')
+        # incremental mode: per-URL validators + content hash, and the list of what changed
+        # (kept outside scraped_data/ so ingestion does not pick them up as restaurants)
+        self.state_path = os.path.join(self.output_root, 'scrape_state.json')
+        self.manifest_path = os.path.join(self.output_root, 'changed_restaurants.json')
+        self.state_lock = threading.Lock()
+        self.state = self.load_state()
+        self.archive = ResponseArchive(archive_path) if record or replay else None
+        self.record = record
+        self.replay = replay
+        # output: 'files' (scraped_data/<name>.json), 'jsonl' (one consolidated dataset_path) or 'both'
+        self.write_files = output in ('files', 'both')
+        self.dataset = DatasetWriter(os.path.join(self.output_root, dataset_path)) if output in ('jsonl', 'both') else None
         # Create scraped_data directory if it doesn't exist
-        if not os.path.exists('scraped_data'):
-            os.makedirs('scraped_data')
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+    def create_session(self, retries, backoff):
+        """One pooled keep-alive session shared by all worker threads, with retry + backoff"""
+        session = requests.Session()
+        session.headers.update(self.get_headers())
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
             
     def get_headers(self):
         return {
@@ -160,24 +478,104 @@ class RunningModes:
             'Connection': 'keep-alive',
         }
 
+    def fetch(self, url, validators=None):
+        """GET a page through the shared session, respecting the per-host rate limit.
+        With validators (etag / last_modified from a previous scrape) the request is conditional."""
+        if self.replay:
+            return self.archive.load(url)
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        self.rate_limiter.wait(url)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        if self.record and response.status_code == 200:
+            self.archive.save(response, url)
+        return response
+
+    def load_state(self):
+        """Per-URL validators and content hashes from the previous incremental run"""
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save_state(self):
+        with self.state_lock:
+            tmp = f"{self.state_path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.state_path)
+
+    def scrape_restaurant_incremental(self, url, contact_no=None):
+        """Scrape a restaurant only if its page changed since the last run.
+        Returns (status, restaurant_data) with status 'changed', 'unchanged' or 'failed'."""
+        try:
+            with self.state_lock:
+                previous = dict(self.state.get(url, {}))
+            if not os.path.exists(previous.get('file', '')):
+                # the last output is gone: fetch unconditionally so it gets written again
+                previous = {}
+            response = self.fetch(url, previous)
+            if response.status_code == 304:
+                return 'unchanged', None
+
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            validators = {
+                "etag": response.headers.get('ETag'),
+                "last_modified": response.headers.get('Last-Modified'),
+                "content_sha256": content_hash,
+            }
+            if content_hash == previous.get('content_sha256'):
+                # same bytes without server-side validators: skip parsing and writing
+                with self.state_lock:
+                    self.state[url].update(validators)
+                return 'unchanged', None
+
+            restaurant_data = self.parse_and_save(response, url, contact_no, validators)
+            if not restaurant_data:
+                return 'failed', None
+            with self.state_lock:
+                self.state[url] = dict(validators, file=self.output_file(restaurant_data))
+            return 'changed', restaurant_data
+
+        except Exception as e:
+            print(f"Error scraping restaurant: {str(e)}")
+            return 'failed', None
+
+    def output_file(self, restaurant_data):
+        return self.scraper.restaurant_filename(restaurant_data, self.output_dir) if self.write_files else self.dataset.path
+
+    def save(self, restaurant_data):
+        """Persist a finished restaurant record exactly once per configured output"""
+        if self.write_files:
+            self.scraper.save_restaurant_json(restaurant_data, self.output_dir)
+        if self.dataset:
+            self.dataset.append(restaurant_data)
+        return self.output_file(restaurant_data)
+
+    def parse_and_save(self, response, url, contact_no=None, validators=None):
+        try:
+            restaurant_data = self.scraper.build_restaurant_json(self.scraper.parse(response.text), url)
+        except Exception as e:
+            print(f"Error creating restaurant JSON: {str(e)}")
+            return None
+        # contact and validators go in before the single write
+        if contact_no:
+            restaurant_data["basic_info"]["contact"] = contact_no
+        if validators:
+            restaurant_data["scrape_metadata"].update(validators)
+        self.save(restaurant_data)
+        return restaurant_data
+
     def scrape_single_restaurant(self, url, contact_no=None):
         """Scrape a single restaurant"""
         try:
-            response = requests.get(url, headers=self.get_headers())
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'lxml')
-            
-            # Modify create_restaurant_json call to include contact_no
-            restaurant_data = self.scraper.create_restaurant_json(soup, url)
-            if restaurant_data and contact_no:
-                restaurant_data["basic_info"]["contact"] = contact_no
-                
-                # Re-save the file with updated contact
-                filename = f"scraped_data/{restaurant_data['basic_info']['name']}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(restaurant_data, f, indent=2, ensure_ascii=False)
-            
-            return restaurant_data
+            response = self.fetch(url)
+            return self.parse_and_save(response, url, contact_no)
             
         except Exception as e:
             print(f"Error scraping restaurant: {str(e)}")
@@ -196,7 +594,7 @@ class RunningModes:
             
             if restaurant_data:
                 print(f"\n✓ Successfully scraped: {restaurant_data['basic_info']['name']}")
-                print(f"Data saved to: scraped_data/{restaurant_data['basic_info']['name']}.json")
+                print(f"Data saved to: {self.output_file(restaurant_data)}")
             else:
                 print("\n✗ Failed to scrape restaurant")
                 
@@ -204,73 +602,181 @@ class RunningModes:
             if again.lower() != 'y':
                 break
 
-    def update_mode(self, restaurant_list):
-        """Update mode for scraping multiple restaurants from a list"""
+    def update_mode(self, restaurant_list, workers=None, incremental=False):
+        """Update mode for scraping multiple restaurants from a list, `workers` at a time.
+        In incremental mode unchanged pages are skipped and a changed-restaurants manifest is written."""
+        workers = workers or self.workers
         print("\n=== Update Mode ===")
-        print(f"Found {len(restaurant_list)} restaurants to scrape")
+        print(f"Found {len(restaurant_list)} restaurants to scrape ({workers} workers{', incremental' if incremental else ''})")
         
         successful = 0
         failed = 0
+        items = 0
+        manifest = {"changed": [], "unchanged": [], "failed": []}
+        start = time.monotonic()
         
+        def scrape(restaurant):
+            if incremental:
+                return self.scrape_restaurant_incremental(restaurant['url'], restaurant.get('contact_no'))
+            data = self.scrape_single_restaurant(restaurant['url'], restaurant.get('contact_no'))
+            return ('changed' if data else 'failed'), data
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(scrape, restaurant): restaurant for restaurant in restaurant_list}
+            for done, future in enumerate(as_completed(futures), start=1):
+                restaurant = futures[future]
+                status, data = future.result()
+                entry = {"name": restaurant['name'], "url": restaurant['url']}
+                if status == 'failed':
+                    failed += 1
+                    print(f"[{done}/{len(restaurant_list)}] ✗ Failed to scrape: {restaurant['name']}")
+                elif status == 'unchanged':
+                    successful += 1
+                    print(f"[{done}/{len(restaurant_list)}] = Unchanged: {restaurant['name']}")
+                else:
+                    successful += 1
+                    items += sum(len(v) for v in data.get('menu', {}).values())
+                    entry["file"] = self.output_file(data)
+                    print(f"[{done}/{len(restaurant_list)}] ✓ Successfully scraped: {restaurant['name']}")
+                manifest[status].append(entry)
+        
+        if incremental:
+            self.save_state()
+            manifest["generated_at"] = datetime.now().isoformat()
+            with open(self.manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+        
+        if self.dataset:
+            print(f"{self.dataset.compact()} restaurants in {self.dataset.path}")
+        elapsed = time.monotonic() - start
+        print(f"\nScraping Complete!")
+        print(f"Successful: {successful}")
+        if incremental:
+            print(f"  Changed: {len(manifest['changed'])}, Unchanged: {len(manifest['unchanged'])}")
+            print(f"  Manifest written to {self.manifest_path}")
+        print(f"Failed: {failed}")
+        print(f"Total: {len(restaurant_list)}")
+        print(f"Menu items: {items}")
+        print(f"Elapsed: {elapsed:.1f}s ({len(restaurant_list) / elapsed if elapsed else 0:.2f} pages/sec, "
+              f"{items / elapsed if elapsed else 0:.0f} items/sec)")
+
+    def pipeline_mode(self, restaurant_list, fetchers=None, parsers=None, queue_size=None):
+        """Bulk scrape as a three-stage pipeline so network and CPU are busy at the same time:
+        `fetchers` threads download pages into a bounded queue, a pool of `parsers` processes turns
+        them into restaurant JSON, and this thread writes the results. When parsing falls behind
+        the queues fill up and the fetchers block (backpressure), so at most about 2 * queue_size
+        pages are held in memory."""
+        fetchers = fetchers or self.workers
+        parsers = parsers or os.cpu_count() or 1
+        queue_size = queue_size or 2 * parsers
+        print("\n=== Pipeline Mode ===")
+        print(f"Found {len(restaurant_list)} restaurants to scrape "
+              f"({fetchers} fetch threads, {parsers} parse processes, queue size {queue_size})")
+
+        todo = queue.Queue()
         for restaurant in restaurant_list:
-            print(f"\nScraping {restaurant['name']}...")
-            
-            data = self.scrape_single_restaurant(
-                restaurant['url'], 
-                contact_no=restaurant['contact_no']
-            )
-            
-            if data:
+            todo.put(restaurant)
+        fetched = queue.Queue(maxsize=queue_size)
+        parsed = queue.Queue(maxsize=queue_size)  # also bounds the parse jobs in flight
+        done = object()
+        metrics = {
+            'fetch': StageMetrics('fetch', fetchers),
+            'parse': StageMetrics('parse', parsers),
+            'write': StageMetrics('write', 1),
+        }
+
+        def fetch_stage():
+            while True:
+                try:
+                    restaurant = todo.get_nowait()
+                except queue.Empty:
+                    fetched.put(done)
+                    return
+                start = time.perf_counter()
+                try:
+                    html, error = self.fetch(restaurant['url']).text, None
+                except Exception as e:
+                    html, error = None, str(e)
+                busy = time.perf_counter() - start
+                fetched.put((restaurant, html, error))
+                metrics['fetch'].add(busy, time.perf_counter() - start - busy, queue_depth=fetched.qsize())
+
+        def parse_stage(pool):
+            remaining = fetchers
+            while remaining:
+                item = fetched.get()
+                if item is done:
+                    remaining -= 1
+                    continue
+                restaurant, html, error = item
+                future = pool.submit(parse_page, html, restaurant['url'], self.parser) if html is not None else None
+                start = time.perf_counter()
+                parsed.put((restaurant, future, error))
+                metrics['parse'].add(blocked=time.perf_counter() - start, count=0, queue_depth=parsed.qsize())
+            parsed.put(done)
+
+        successful = 0
+        failed = 0
+        items = 0
+        start = time.monotonic()
+        with ProcessPoolExecutor(max_workers=parsers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            threads = [threading.Thread(target=fetch_stage, daemon=True) for _ in range(fetchers)]
+            threads.append(threading.Thread(target=parse_stage, args=(pool,), daemon=True))
+            for thread in threads:
+                thread.start()
+
+            # write stage
+            while (item := parsed.get()) is not done:
+                restaurant, future, error = item
+                restaurant_data = None
+                if future is not None:
+                    restaurant_data, error, seconds = future.result()
+                    metrics['parse'].add(busy=seconds)
+                if restaurant_data is None:
+                    failed += 1
+                    print(f"[{successful + failed}/{len(restaurant_list)}] ✗ Failed to scrape: {restaurant['name']} ({error})")
+                    continue
+                write_start = time.perf_counter()
+                if restaurant.get('contact_no'):
+                    restaurant_data["basic_info"]["contact"] = restaurant['contact_no']
+                self.save(restaurant_data)
+                metrics['write'].add(time.perf_counter() - write_start)
                 successful += 1
-                print(f"✓ Successfully scraped: {restaurant['name']}")
-            else:
-                failed += 1
-                print(f"✗ Failed to scrape: {restaurant['name']}")
-        
+                items += sum(len(v) for v in restaurant_data['menu'].values())
+                print(f"[{successful + failed}/{len(restaurant_list)}] ✓ Successfully scraped: {restaurant['name']}")
+
+            for thread in threads:
+                thread.join()
+
+        if self.dataset:
+            print(f"{self.dataset.compact()} restaurants in {self.dataset.path}")
+        elapsed = time.monotonic() - start
         print(f"\nScraping Complete!")
         print(f"Successful: {successful}")
         print(f"Failed: {failed}")
         print(f"Total: {len(restaurant_list)}")
+        print(f"Menu items: {items}")
+        print(f"Elapsed: {elapsed:.1f}s ({len(restaurant_list) / elapsed if elapsed else 0:.2f} pages/sec, "
+              f"{items / elapsed if elapsed else 0:.0f} items/sec)")
+        print("\nStages:")
+        for stage in metrics.values():
+            print("  " + stage.report(elapsed))
+
+    def replay_targets(self):
+        """Every archived page as an update_mode target, keeping names/contacts of known restaurants"""
+        known = {r['url']: r for r in load_target_restaurants()}
+        return [known.get(url, {"name": url, "url": url}) for url in self.archive.urls()]
 
 
 # THESE ARE THE TARGET RESTAURANTS
-target_restaurants = [
-    {
-        "name"  : "Sharma Ji Ki Chai",
-        "url": "https://www.justdial.com/Lucknow/Sharma-Ji-Ki-Chai-Near-novality-cinema-Hazratganj/0522PX522-X522-160826112726-G6H1_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07947109049"
-    },
-    {
-        "name" : "Tunday Kababi",
-        "url" : "https://www.justdial.com/Lucknow/Tunday-Kababi-Beside-StMarry-Inter-College-Neer-Around-Town-Aminabad/0522PX522-X522-101028105411-T9G7_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07942693231"
-    },
-    {
-        "name"  : "Milan A Speciality Restaurant",
-        "url"   :  "https://www.justdial.com/Lucknow/Milan-A-Speciality-Restaurant-Opposite-Railway-Station-Charbagh/0522PX522-X522-110304200136-G5H7_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07942689078"
-    },
-    {
-        "name"  : "Moti Mahal Restaurant",
-        "url"   : "https://www.justdial.com/Lucknow/Moti-Mahal-Restaurant-Next-Central-Bank-Of-India-Near-Hanuman-Mandir-Opposite-Multi-Level-Parking-Hazratganj/0522P522STDS000110_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07947137089"
-    },
-    {
-        "name" : "Colours By Royal Cafe",
-        "url": "https://www.justdial.com/Lucknow/Colours-By-Royal-Cafe-Opposite-Sahara-Ganj-Mall-Hazratganj/0522PX522-X522-171223163048-Y9E7_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst"  ,   
-        "contact_no" :  "07947111398"
-    },
-    {
-        "name" : "Barbeque Nation",
-        "url" : "https://www.justdial.com/Lucknow/Barbeque-Nation-Vipin-Khand-Gomti-Nagar/0522PX522-X522-130329165812-U5P6_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07947148142"
-    },
-    {
-        "name" : "Mashi Biryani World",
-        "url" : "https://www.justdial.com/Lucknow/Mashi-Biryani-World-Behind-Neebu-Park-Bada-Imambada-Oppo-Khunkhun-Ji-Lucknow-Chowk/0522PX522-X522-160705173620-S6L4_BZDET/menu?trkid=277-remotecity-fcat&term=Restaurants&ncatid=10408936&area=&search=Best%20Restaurants%20in%20Lucknow%20-%20Order%20Food%20Online&mncatname=Restaurants&abd_btn=&abd_heading=&bd=1&cat_b2b_flag=0&searchfrom=lst",
-        "contact_no" :  "07947138467"
-    }
-]
+TARGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'public', 'target_restaurants.json')
+# Synthetic archive of the target restaurants' pages, replayed when nothing has been recorded yet
+SAMPLE_ARCHIVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'scrape_archive')
+
+def load_target_restaurants(path=TARGETS_PATH):
+    """Load the [{name, url, contact_no}, ...] list of restaurants to scrape"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 def main():
     modes = RunningModes()
@@ -279,15 +785,29 @@ def main():
         print("\n=== Restaurant Scraper ===")
         print("1. Interactive Mode (Single Restaurant)")
         print("2. Update Mode (Multiple Restaurants)")
-        print("3. Exit")
+        print("3. Incremental Update Mode (only changed pages)")
+        print("4. Record Mode (Update Mode, saving raw pages to scrape_archive/)")
+        print("5. Replay Mode (re-parse scrape_archive/ offline into replay_output/, at full speed)")
+        print("6. Pipeline Mode (fetch threads -> parse processes -> writer)")
+        print("7. Exit")
         
-        choice = input("\nSelect mode (1-3): ")
+        choice = input("\nSelect mode (1-7): ")
         
         if choice == '1':
             modes.interactive_mode()
         elif choice == '2':
-            modes.update_mode(target_restaurants)
+            modes.update_mode(load_target_restaurants())
         elif choice == '3':
+            modes.update_mode(load_target_restaurants(), incremental=True)
+        elif choice == '4':
+            RunningModes(record=True).update_mode(load_target_restaurants())
+        elif choice == '5':
+            archive_path = 'scrape_archive' if os.path.isdir('scrape_archive') else SAMPLE_ARCHIVE
+            replay = RunningModes(replay=True, archive_path=archive_path)
+            replay.update_mode(replay.replay_targets())
+        elif choice == '6':
+            modes.pipeline_mode(load_target_restaurants())
+        elif choice == '7':
             print("\nGoodbye!")
             break
         else:
@@ -1,71 +1,329 @@
 # doc string have been used to clarify the usage
 
 import chromadb
+import sys
 import json
+import hashlib
 import os
 import uuid
 import shutil
-from typing import Dict, List, Any, Optional, Tuple
+import time
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+# the embedding backend lives in the RAG agent's core package so index and query vectors match
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from core.embeddings import LocalEmbeddingFunction, check_embedding_consistency
+from core.snapshot import collection_fingerprint
+from core.stats import compute_restaurant_stats, load_stats, save_stats, stats_path
+
+class BatchWriter:
+    """
+    Buffers ids, documents and metadatas per collection and adds them in batches,
+    so embedding and the SQLite write happen once per batch instead of once per item
+    
+    Args:
+        batch_size: Records per collection.add call (Chroma caps this at a few thousand)
+        upsert: Use collection.upsert, overwriting records whose ids already exist
+        embedding_function: Embeds each batch before it is written (otherwise the collection's own)
+    """
+    def __init__(self, batch_size: int = 1000, upsert: bool = False, embedding_function=None):
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.embedding_function = embedding_function
+        self.embed_seconds = 0.0
+        self.pending: Dict[str, Tuple[Any, List[str], List[str], List[Dict[str, Any]]]] = {}
+        self.written = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+
+    def add(self, collection, record_id: str, document: str, metadata: Dict[str, Any]) -> None:
+        """
+        Queue one record, flushing the collection's buffer once it is full
+        
+        Args:
+            collection: ChromaDB collection the record belongs to
+            record_id: Record id
+            document: Text to embed
+            metadata: Record metadata
+        """
+        if collection.name not in self.pending:
+            self.pending[collection.name] = (collection, [], [], [])
+        _, ids, documents, metadatas = self.pending[collection.name]
+        ids.append(record_id)
+        documents.append(document)
+        metadatas.append(metadata)
+        if len(ids) >= self.batch_size:
+            self.flush(collection.name)
+
+    def flush(self, collection_name: Optional[str] = None) -> None:
+        """
+        Write buffered records, for one collection or (by default) all of them
+        
+        Args:
+            collection_name: Only flush this collection
+        """
+        names = [collection_name] if collection_name else list(self.pending)
+        for name in names:
+            collection, ids, documents, metadatas = self.pending.pop(name, (None, [], [], []))
+            if not ids:
+                continue
+            start = time.perf_counter()
+            write = collection.upsert if self.upsert else collection.add
+            if self.embedding_function is not None:
+                embeddings = self.embedding_function(documents)
+                self.embed_seconds += time.perf_counter() - start
+                write(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+            else:
+                write(ids=ids, documents=documents, metadatas=metadatas)
+            self.write_seconds += time.perf_counter() - start
+            self.written += len(ids)
+            self.batches += 1
+
+
+def load_restaurant_chunk(chunk: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]], float, float]:
+    """
+    Parse and sanitize a chunk of raw restaurant records (runs in the ingestion worker processes)
+    
+    Args:
+        chunk: (source label, raw JSON text) pairs
+    
+    Returns:
+        (source label, sanitized data or None, error or None) per record, seconds parsing, seconds sanitizing
+    """
+    results = []
+    parse_seconds = sanitize_seconds = 0.0
+    for label, raw in chunk:
+        start = time.perf_counter()
+        try:
+            data = json.loads(raw)
+            parsed = time.perf_counter()
+            parse_seconds += parsed - start
+            # freshly parsed, so nothing else holds a reference: sanitize without copying
+            results.append((label, Vectorizer.sanitize_restaurant_data(data, in_place=True), None))
+            sanitize_seconds += time.perf_counter() - parsed
+        except Exception as e:
+            results.append((label, None, f"{type(e).__name__}: {e}"))
+    return results, parse_seconds, sanitize_seconds
+
 
 class Vectorizer:
-    def process_restaurant_data(self, json_files_path: str, restaurant_collection, menu_item_collection) -> None:
+    def __init__(self, batch_size: int = 1000, workers: Optional[int] = None, chunk_size: int = 32,
+                 embedding_function=None):
+        """
+        Args:
+            batch_size: Records per ChromaDB add call during ingestion
+            workers: Processes parsing and sanitizing records during ingestion (default: one per core)
+            chunk_size: Records handed to a worker at a time
+            embedding_function: Embeds documents and queries; must match the one the RAG agent's
+                Retriever uses (default: core.embeddings.LocalEmbeddingFunction)
+        """
+        self.embedding_function = embedding_function or LocalEmbeddingFunction()
+        self.stats: Optional[Dict[str, Dict[str, Any]]] = None
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def process_restaurant_data(self, json_files_path: str, restaurant_collection, menu_item_collection,
+                                incremental: bool = False) -> None:
         """
         Process restaurant data from JSON files and add to ChromaDB collections
         
         Args:
-            json_files_path: Directory containing restaurant JSON files
+            json_files_path: Directory containing restaurant JSON files, or a consolidated .jsonl dataset
             restaurant_collection: ChromaDB collection for restaurant data
             menu_item_collection: ChromaDB collection for menu item data
+            incremental: Update an existing DB in place: skip restaurants whose content hash is unchanged,
+                upsert changed ones, drop their removed items and drop restaurants no longer in the data
         """
         if not os.path.exists(json_files_path):
-            print(f"Error: Directory {json_files_path} not found!")
+            print(f"Error: {json_files_path} not found!")
             return
             
         processed_restaurants = 0
         all_locations = set()
-        
-        # Process each JSON file
-        for filename in os.listdir(json_files_path):
-            if filename.endswith('.json'):
-                file_path = os.path.join(json_files_path, filename)
+        batch = BatchWriter(self.batch_size, upsert=incremental, embedding_function=self.embedding_function)
+        start = time.perf_counter()
+        
+        # content hash of every restaurant already indexed
+        existing: Dict[str, str] = {}
+        if incremental:
+            current = restaurant_collection.get(include=["metadatas"])
+            existing = {rid: (meta or {}).get('content_hash', '') for rid, meta in zip(current['ids'], current['metadatas'])}
+        seen = set()
+        unchanged = 0
+        errors = 0
+        timings = {"read": 0.0, "parse": 0.0, "sanitize": 0.0, "index": 0.0}
+        
+        # Process each restaurant record, parsed and sanitized by the worker pool
+        for filename, sanitized_data, error in self.load_restaurant_records(json_files_path, timings):
+            if error:
+                errors += 1
+                print(f"Error processing {filename}: {error}")
+                continue
+            index_start = time.perf_counter()
+            write_before = batch.write_seconds
+            try:
+                # Extract location
+                location = self.extract_location(sanitized_data['basic_info']['address'])
+                all_locations.add(location)
                 
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Sanitize data to handle None values
-                    sanitized_data = self.sanitize_restaurant_data(data)
-                    
-                    # Extract location
-                    location = self.extract_location(sanitized_data['basic_info']['address'])
-                    all_locations.add(location)
-                    
-                    # Add to database
-                    self.add_restaurant_to_db(sanitized_data, restaurant_collection, menu_item_collection)
-                    
-                    processed_restaurants += 1
-                    print(f"Processed {filename}")
-                    
-                except Exception as e:
-                    print(f"Error processing {filename}: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
+                restaurant_id = self.restaurant_id(sanitized_data)
+                if restaurant_id in seen:
+                    print(f"Skipping {filename}: restaurant already ingested from another record")
+                    continue
+                seen.add(restaurant_id)
+                if incremental and existing.get(restaurant_id) == self.content_hash(sanitized_data):
+                    unchanged += 1
+                    continue
+                
+                # Add to database
+                item_ids = self.add_restaurant_to_db(sanitized_data, restaurant_collection, menu_item_collection, batch)
+                
+                # Items that disappeared from an updated menu
+                if restaurant_id in existing:
+                    indexed = menu_item_collection.get(where={"restaurant_id": restaurant_id}, include=[])['ids']
+                    removed = sorted(set(indexed) - set(item_ids))
+                    if removed:
+                        menu_item_collection.delete(ids=removed)
+                
+                processed_restaurants += 1
+                print(f"{'Updated' if restaurant_id in existing else 'Processed'} {filename}")
+                
+            except Exception as e:
+                errors += 1
+                print(f"Error processing {filename}: {str(e)}")
+                import traceback
+                traceback.print_exc()
+            finally:
+                timings["index"] += time.perf_counter() - index_start - (batch.write_seconds - write_before)
+        
+        batch.flush()
+        
+        # Restaurants no longer in the data (skipped if some records failed, they may just be unreadable)
+        stale = sorted(set(existing) - seen)
+        if incremental and stale and not errors:
+            menu_item_collection.delete(where={"restaurant_id": {"$in": stale}})
+            restaurant_collection.delete(ids=stale)
+            print(f"Removed {len(stale)} restaurants no longer in {json_files_path}")
+        elapsed = time.perf_counter() - start
         
         print(f"Successfully indexed {processed_restaurants} restaurants")
+        if incremental:
+            print(f"Skipped {unchanged} unchanged restaurants")
+        print(f"Indexed {batch.written} records in {batch.batches} batches of up to {self.batch_size}: "
+              f"{elapsed:.1f}s total, {batch.embed_seconds:.1f}s embedding, {batch.write_seconds - batch.embed_seconds:.1f}s writing "
+              f"({batch.written / elapsed if elapsed else 0:.0f} items/sec)")
+        print(f"Stages: read {timings['read']:.2f}s, parse {timings['parse']:.2f}s + sanitize {timings['sanitize']:.2f}s "
+              f"(summed over {self.workers} worker{'s' if self.workers > 1 else ''}), build records {timings['index']:.2f}s, "
+              f"embed {batch.embed_seconds:.2f}s, write {batch.write_seconds - batch.embed_seconds:.2f}s")
         print(f"Locations covered: {', '.join(sorted(all_locations))}")
 
 
-    def sanitize_restaurant_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def load_restaurant_records(self, json_files_path: str, timings: Dict[str, float]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Stream parsed, sanitized restaurant records, parsing chunks of them in a process pool
+        while the caller indexes the previous ones
+        
+        Args:
+            json_files_path: Directory of <name>.json files, or a .jsonl dataset
+            timings: Per-stage seconds, accumulated under 'read', 'parse' and 'sanitize'
+        
+        Returns:
+            Iterator of (source label, sanitized data or None, error or None), in input order
+        """
+        def unpack(result):
+            records, parse_seconds, sanitize_seconds = result
+            timings["parse"] += parse_seconds
+            timings["sanitize"] += sanitize_seconds
+            return records
+        
+        chunks = self.chunk_restaurant_records(json_files_path, timings)
+        first = next(chunks, [])
+        if self.workers <= 1 or len(first) < self.chunk_size:
+            # a single chunk is not worth starting worker processes for
+            for chunk in itertools.chain([first], chunks):
+                yield from unpack(load_restaurant_chunk(chunk))
+            return
+        
+        # spawn, not fork: the parent may already hold an open Chroma client
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            pending = deque()
+            for chunk in itertools.chain([first], chunks):
+                pending.append(pool.submit(load_restaurant_chunk, chunk))
+                # bounded read-ahead so a large corpus is never fully held in memory
+                if len(pending) >= 2 * self.workers:
+                    yield from unpack(pending.popleft().result())
+            while pending:
+                yield from unpack(pending.popleft().result())
+
+
+    def chunk_restaurant_records(self, json_files_path: str, timings: Dict[str, float]) -> Iterator[List[Tuple[str, str]]]:
+        """
+        Group raw records into chunks of chunk_size for the worker pool
+        
+        Args:
+            json_files_path: Directory of <name>.json files, or a .jsonl dataset
+            timings: Seconds spent reading are accumulated under 'read'
+        
+        Returns:
+            Iterator of lists of (source label, raw JSON text)
+        """
+        records = self.iter_restaurant_records(json_files_path)
+        chunk = []
+        while True:
+            start = time.perf_counter()
+            record = next(records, None)
+            timings["read"] += time.perf_counter() - start
+            if record is None:
+                break
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+    def iter_restaurant_records(self, json_files_path: str) -> Iterator[Tuple[str, str]]:
+        """
+        Stream raw restaurant records from a directory of JSON files or a consolidated JSONL dataset
+        
+        Args:
+            json_files_path: Directory of <name>.json files, or a .jsonl file with one restaurant per line
+        
+        Returns:
+            Iterator of (source label, raw JSON text) pairs
+        """
+        if os.path.isfile(json_files_path):
+            with open(json_files_path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, start=1):
+                    if line.strip():
+                        yield f"{os.path.basename(json_files_path)}:{line_no}", line
+            return
+        
+        for filename in os.listdir(json_files_path):
+            if filename.endswith('.json'):
+                with open(os.path.join(json_files_path, filename), 'r', encoding='utf-8') as f:
+                    yield filename, f.read()
+
+
+    @staticmethod
+    def sanitize_restaurant_data(data: Dict[str, Any], in_place: bool = False) -> Dict[str, Any]:
         """
         Validate and sanitize restaurant data to prevent None values
         
         Args:
             data: Raw restaurant data from JSON
+            in_place: Fix up `data` itself instead of a deep copy of it
         Returns:
             Sanitized restaurant data
         """
         # Make a deep copy to avoid modifying the original
-        sanitized = json.loads(json.dumps(data))
+        sanitized = data if in_place else json.loads(json.dumps(data))
         
         # Sanitize basic info
         if 'basic_info' in sanitized:
@@ -92,7 +350,8 @@ class Vectorizer:
         return sanitized
 
 
-    def add_restaurant_to_db(self, restaurant_data: Dict[str, Any], restaurant_collection, menu_item_collection) -> None:
+    def add_restaurant_to_db(self, restaurant_data: Dict[str, Any], restaurant_collection, menu_item_collection,
+                             batch: Optional[BatchWriter] = None) -> List[str]:
         """
         Add a restaurant and its menu items to ChromaDB
         
@@ -100,10 +359,14 @@ class Vectorizer:
             restaurant_data: JSON data for a restaurant
             restaurant_collection: ChromaDB collection for restaurant data
             menu_item_collection: ChromaDB collection for menu item data
+            batch: Queue the records on this BatchWriter instead of adding them immediately
+        
+        Returns:
+            Ids of the restaurant's menu items
         """
         # Extract basic info
         restaurant_name = restaurant_data['basic_info']['name']
-        restaurant_id = str(uuid.uuid4())
+        restaurant_id = self.restaurant_id(restaurant_data)
         location = self.extract_location(restaurant_data['basic_info']['address'])
         
         # Create restaurant document text for embedding
@@ -126,23 +389,36 @@ class Vectorizer:
             "rating": restaurant_data['basic_info'].get('rating', 0) or 0,  # Replace None with 0
             "contact": restaurant_data['basic_info'].get('contact', '') or '',  # Replace None with empty string
             "operating_hours": restaurant_data['basic_info'].get('operating_hours', '') or '',
+            "content_hash": self.content_hash(restaurant_data),
             "type": "restaurant"
         }
         
         # Add restaurant to collection
-        restaurant_collection.add(
-            ids=[restaurant_id],
-            documents=[restaurant_text],
-            metadatas=[metadata]
-        )
+        if batch is not None:
+            batch.add(restaurant_collection, restaurant_id, restaurant_text, metadata)
+        else:
+            restaurant_collection.add(
+                ids=[restaurant_id],
+                documents=[restaurant_text],
+                metadatas=[metadata],
+                embeddings=self.embedding_function([restaurant_text])
+            )
         
         # Process menu items
+        item_ids = []
         for category, items in restaurant_data['menu'].items():
+            occurrences: Dict[str, int] = {}
             for item in items:
-                self.add_menu_item_to_db(item, category, restaurant_id, restaurant_name, menu_item_collection)
+                # a repeated name in the same category gets its own id
+                occurrences[item['name']] = occurrences.get(item['name'], 0) + 1
+                item_id = self.menu_item_id(restaurant_id, category, item['name'], occurrences[item['name']])
+                self.add_menu_item_to_db(item, category, restaurant_id, restaurant_name, menu_item_collection, batch, item_id)
+                item_ids.append(item_id)
+        return item_ids
 
 
-    def add_menu_item_to_db(self, item: Dict[str, Any], category: str, restaurant_id: str, restaurant_name: str, menu_item_collection) -> None:
+    def add_menu_item_to_db(self, item: Dict[str, Any], category: str, restaurant_id: str, restaurant_name: str, menu_item_collection,
+                            batch: Optional[BatchWriter] = None, item_id: Optional[str] = None) -> None:
         """
         Add a menu item to ChromaDB
         
@@ -152,8 +428,10 @@ class Vectorizer:
             restaurant_id: Parent restaurant ID
             restaurant_name: Parent restaurant name
             menu_item_collection: ChromaDB collection for menu item data
+            batch: Queue the record on this BatchWriter instead of adding it immediately
+            item_id: Record id, derived from restaurant, category and item name if not given
         """
-        item_id = str(uuid.uuid4())
+        item_id = item_id or self.menu_item_id(restaurant_id, category, item['name'])
         
         # Handle potential None in veg_status
         veg_status = item.get('veg_status', 'unknown')
@@ -196,11 +474,60 @@ class Vectorizer:
         }
         
         # Add menu item to collection
-        menu_item_collection.add(
-            ids=[item_id],
-            documents=[item_text],
-            metadatas=[metadata]
-        )
+        if batch is not None:
+            batch.add(menu_item_collection, item_id, item_text, metadata)
+        else:
+            menu_item_collection.add(
+                ids=[item_id],
+                documents=[item_text],
+                metadatas=[metadata],
+                embeddings=self.embedding_function([item_text])
+            )
+
+
+    def restaurant_id(self, restaurant_data: Dict[str, Any]) -> str:
+        """
+        Deterministic restaurant id, so re-ingesting a restaurant updates it instead of duplicating it
+        
+        Args:
+            restaurant_data: JSON data for a restaurant
+        
+        Returns:
+            UUID derived from the scrape URL (or the name if the URL is missing)
+        """
+        url = restaurant_data.get('scrape_metadata', {}).get('scrape_url') or restaurant_data['basic_info']['name']
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, url))
+
+
+    def menu_item_id(self, restaurant_id: str, category: str, name: str, occurrence: int = 1) -> str:
+        """
+        Deterministic menu item id
+        
+        Args:
+            restaurant_id: Parent restaurant ID
+            category: Menu category
+            name: Item name
+            occurrence: 1 for the first item with this name in the category, 2 for the next, ...
+        
+        Returns:
+            UUID derived from the restaurant id, category and item name
+        """
+        key = f"{category}\x1f{name}" + (f"\x1f{occurrence}" if occurrence > 1 else "")
+        return str(uuid.uuid5(uuid.UUID(restaurant_id), key))
+
+
+    def content_hash(self, restaurant_data: Dict[str, Any]) -> str:
+        """
+        Hash of the indexed content of a restaurant (basic info and menu, not scrape metadata)
+        
+        Args:
+            restaurant_data: JSON data for a restaurant
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        content = {"basic_info": restaurant_data['basic_info'], "menu": restaurant_data['menu']}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
 
 
     def extract_location(self, address: str) -> str:
@@ -238,7 +565,7 @@ class Vectorizer:
             where_clause["location"] = location
         
         results = restaurant_collection.query(
-            query_texts=[query],
+            query_embeddings=self.embedding_function([query]),
             n_results=limit,
             where=where_clause
         )
@@ -275,7 +602,7 @@ class Vectorizer:
             where_clause["price_range"] = price_range
         
         results = menu_item_collection.query(
-            query_texts=[query],
+            query_embeddings=self.embedding_function([query]),
             n_results=limit,
             where=where_clause
         )
@@ -291,62 +618,90 @@ class Vectorizer:
     def compare_restaurants(self, restaurant_names: List[str], restaurant_collection, 
                             menu_item_collection, aspect: str = "rating") -> List[Dict[str, Any]]:
         """
-        Compare restaurants based on a specific aspect
+        Compare restaurants based on a specific aspect, using the precomputed stats table
         
         Args:
             restaurant_names: List of restaurant names to compare
             restaurant_collection: ChromaDB collection for restaurant data
             menu_item_collection: ChromaDB collection for menu item data
-            aspect: Aspect to compare ('rating', 'menu_variety', etc.)
+            aspect: Aspect to compare ('rating', 'menu_count', 'veg_percentage', 'avg_price', 'median_price')
             
         Returns:
             Comparison results sorted by the specified aspect
         """
+        stats = self.stats if self.stats is not None else {}
+        by_lower = {name.lower(): name for name in stats}
         results = []
         
         for name in restaurant_names:
-            # Find the restaurant by name
-            restaurant_results = restaurant_collection.query(
-                query_texts=[name],
-                n_results=1
-            )
-            
-            if len(restaurant_results['ids'][0]) > 0:
-                restaurant_id = restaurant_results['ids'][0][0]
-                restaurant_metadata = restaurant_results['metadatas'][0][0]
-                
-                # Get menu items for this restaurant
-                menu_results = menu_item_collection.query(
-                    query_texts=[""],  # Empty query to match all
-                    n_results=100,     # Get many items
-                    where={"restaurant_name": restaurant_metadata['name']}
+            # Exact (case-insensitive) name first, semantic lookup only for names we don't know
+            canonical = by_lower.get(name.strip().lower())
+            if canonical is None:
+                restaurant_results = restaurant_collection.query(
+                    query_embeddings=self.embedding_function([name]),
+                    n_results=1
                 )
-                
-                # Calculate metrics
-                menu_count = len(menu_results['ids'][0])
-                veg_count = sum(1 for i in range(menu_count) 
-                            if menu_results['metadatas'][0][i]['veg_status'] == 'veg')
-                
-                avg_price = 0
-                if menu_count > 0:
-                    avg_price = sum(menu_results['metadatas'][0][i]['price'] for i in range(menu_count)) / menu_count
-                
-                # Add to results
-                results.append({
-                    "name": restaurant_metadata['name'],
-                    "rating": restaurant_metadata.get('rating', 0),
-                    "menu_count": menu_count,
-                    "veg_percentage": (veg_count / menu_count * 100) if menu_count > 0 else 0,
-                    "avg_price": avg_price
-                })
+                if len(restaurant_results['ids'][0]) == 0:
+                    continue
+                canonical = restaurant_results['metadatas'][0][0]['name']
+            
+            entry = stats.get(canonical)
+            if entry is None:
+                # no stats table yet: aggregate this restaurant's full menu (no result cap)
+                menu = menu_item_collection.get(where={"restaurant_name": canonical}, include=["metadatas"])
+                info = restaurant_collection.get(where={"name": canonical}, include=["metadatas"])
+                entry = compute_restaurant_stats(menu['metadatas'], info['metadatas']).get(canonical)
+                if entry is None:
+                    continue
+            
+            price = entry.get('price') or {}
+            results.append({
+                "name": canonical,
+                "rating": entry.get('rating', 0) or 0,
+                "menu_count": entry['item_count'],
+                "veg_percentage": entry['veg_share'] * 100,
+                "avg_price": price.get('mean', 0),
+                "median_price": price.get('p50', 0),
+                "category_counts": entry['category_counts']
+            })
         
         # Sort by the requested aspect
-        if aspect in ["rating", "menu_count", "veg_percentage", "avg_price"]:
+        if aspect in ["rating", "menu_count", "veg_percentage", "avg_price", "median_price"]:
             results.sort(key=lambda x: x[aspect], reverse=True)
         
         return results
 
 
+    def build_restaurant_stats(self, restaurant_collection, menu_item_collection, persist_directory: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate per-restaurant stats over the whole DB and store them with it
+        
+        Args:
+            restaurant_collection: ChromaDB collection for restaurant data
+            menu_item_collection: ChromaDB collection for menu item data
+            persist_directory: ChromaDB directory the stats file is written to
+            
+        Returns:
+            Stats table keyed by restaurant name (see core.stats.compute_restaurant_stats)
+        """
+        def all_metadatas(collection) -> List[Dict[str, Any]]:
+            rows, offset = [], 0
+            while True:
+                page = collection.get(include=["metadatas"], limit=5000, offset=offset)
+                rows.extend(page['metadatas'])
+                if len(page['ids']) < 5000:
+                    return rows
+                offset += 5000
+        
+        start = time.perf_counter()
+        self.stats = compute_restaurant_stats(all_metadatas(menu_item_collection), all_metadatas(restaurant_collection))
+        fingerprint = collection_fingerprint(persist_directory, [restaurant_collection, menu_item_collection])
+        save_stats(persist_directory, self.stats, fingerprint)
+        print(f"Stored stats for {len(self.stats)} restaurants in {stats_path(persist_directory)} "
+              f"({time.perf_counter() - start:.2f}s)")
+        return self.stats
+
+
     def find_restaurants_for_dietary_needs(self, dietary_preference: str, menu_item_collection,
                                         restaurant_collection, location: Optional[str] = None, 
                                         limit: int = 3) -> List[Dict[str, Any]]:
@@ -369,7 +724,7 @@ class Vectorizer:
         where_clause = {"veg_status": veg_status}
         
         menu_results = menu_item_collection.query(
-            query_texts=[dietary_preference],
+            query_embeddings=self.embedding_function([dietary_preference]),
             n_results=50,  # Get many items
             where=where_clause
         )
@@ -394,7 +749,7 @@ class Vectorizer:
         for restaurant_name, items in sorted_restaurants[:limit]:
             # Get restaurant details
             restaurant_results = restaurant_collection.query(
-                query_texts=[restaurant_name],
+                query_embeddings=self.embedding_function([restaurant_name]),
                 n_results=1
             )
             
@@ -423,7 +778,7 @@ class Vectorizer:
         """
         print("\n=== Testing Restaurant Search ===")
         results = restaurant_collection.query(
-            query_texts=["popular restaurants"],
+            query_embeddings=self.embedding_function(["popular restaurants"]),
             n_results=3
         )
         
@@ -433,7 +788,7 @@ class Vectorizer:
         
         print("\n=== Testing Menu Item Search ===")
         results = menu_item_collection.query(
-            query_texts=["tandoori dishes"],
+            query_embeddings=self.embedding_function(["tandoori dishes"]),
             n_results=5
         )
         
@@ -444,7 +799,7 @@ class Vectorizer:
         
         print("\n=== Testing Vegetarian Filter ===")
         results = menu_item_collection.query(
-            query_texts=["vegetarian food"],
+            query_embeddings=self.embedding_function(["vegetarian food"]),
             n_results=5,
             where={"veg_status": "veg"}
         )
@@ -456,7 +811,7 @@ class Vectorizer:
         
         print("\n=== Testing Price Range Filter ===")
         results = menu_item_collection.query(
-            query_texts=["affordable food"],
+            query_embeddings=self.embedding_function(["affordable food"]),
             n_results=5,
             where={"price_range": "budget"}
         )
@@ -469,7 +824,7 @@ class Vectorizer:
         # Demonstrate advanced query utility functions
         print("\n=== Restaurant Comparison ===")
         restaurants = restaurant_collection.query(
-            query_texts=[""],
+            query_embeddings=self.embedding_function([""]),
             n_results=2
         )
         
@@ -481,13 +836,16 @@ class Vectorizer:
             print(f"Comparing {restaurant1} vs {restaurant2}:")
             for restaurant in results:
                 print(f"- {restaurant['name']}: Rating: {restaurant['rating']}, " +
-                    f"Avg Price: ₹{restaurant['avg_price']:.2f}, " +
+                    f"Avg Price: ₹{restaurant['avg_price']:.2f} (median ₹{restaurant['median_price']:.0f}), " +
                     f"Veg Options: {restaurant['veg_percentage']:.1f}%")
 
 
     def main(self):
         # Define paths
-        json_files_path = "../public/scraped_data"
+        # prefer the consolidated dataset written by the scraper's jsonl output
+        json_files_path = "../public/scraped_data.jsonl"
+        if not os.path.exists(json_files_path):
+            json_files_path = "../public/scraped_data"
         persist_directory = "./restaurant_vector_db"
         
         # Check if the vector DB directory exists
@@ -504,6 +862,7 @@ class Vectorizer:
                 
                 # Process restaurant data
                 self.process_restaurant_data(json_files_path, restaurant_collection, menu_item_collection)
+                self.build_restaurant_stats(restaurant_collection, menu_item_collection, persist_directory)
             else:
                 # Use existing database
                 client = chromadb.PersistentClient(path=persist_directory)
@@ -511,9 +870,20 @@ class Vectorizer:
                     restaurant_collection = client.get_collection("restaurants")
                     menu_item_collection = client.get_collection("menu_items")
                     print(f"Using existing database with {restaurant_collection.count()} restaurants and {menu_item_collection.count()} menu items")
+                    check_embedding_consistency(menu_item_collection, self.embedding_function)
                 except ValueError as e:
                     print(f"Error accessing collections: {e}")
                     return
+                
+                # Only re-embed restaurants whose data changed since the last ingestion
+                if input(f"Update it incrementally from {json_files_path}? (y/n): ").lower() == 'y':
+                    self.process_restaurant_data(json_files_path, restaurant_collection, menu_item_collection, incremental=True)
+                    self.build_restaurant_stats(restaurant_collection, menu_item_collection, persist_directory)
+                else:
+                    fingerprint = collection_fingerprint(persist_directory, [restaurant_collection, menu_item_collection])
+                    self.stats = load_stats(persist_directory, fingerprint)
+                    if self.stats is None:
+                        self.build_restaurant_stats(restaurant_collection, menu_item_collection, persist_directory)
         else:
             # Create new database
             print("Creating new vector database...")
@@ -523,10 +893,13 @@ class Vectorizer:
             
             # Process restaurant data
             self.process_restaurant_data(json_files_path, restaurant_collection, menu_item_collection)
+            self.build_restaurant_stats(restaurant_collection, menu_item_collection, persist_directory)
         
         # Test the database
         self.test_queries(restaurant_collection, menu_item_collection)
 
 
-vectorDBmaker = Vectorizer()
-vectorDBmaker.main()
\ No newline at end of file
+# guarded so the ingestion worker processes can import this module
+if __name__ == "__main__":
+    vectorDBmaker = Vectorizer()
+    vectorDBmaker.main()
\ No newline at end of file
@@ -0,0 +1,219 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from groq import AsyncGroq
+from huggingface_hub import AsyncInferenceClient
+
+from core.cache import AnswerCache
+from core.filters import Constraints
+from core.menu_store import MenuRow
+from core.rag_agent import (
+    Retriever, build_messages, default_model, format_context, format_history, groq_fallback_key,
+    groq_fallback_model, provider, _digest,
+)
+
+
+class AsyncRetriever:
+    """asyncio facade over a (shared) Retriever.
+
+    Chroma and the embedding model are synchronous, so searches run on a thread pool;
+    the restaurant and menu searches for one query are issued concurrently.
+    """
+
+    def __init__(self, retriever: Retriever, max_workers: int = 8):
+        self.retriever = retriever
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retriever")
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def search_restaurants(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.retriever.search_restaurants, query, k)
+
+    async def search_menu_items(
+        self,
+        query: str,
+        restaurant: Optional[str] = None,
+        category: Optional[str] = None,
+        k: Optional[int] = None,
+        constraints: Optional[Constraints] = None,
+    ) -> List[MenuRow]:
+        return await self._run(self.retriever.search_menu_items, query, restaurant, category, k, constraints)
+
+    async def search_both(
+        self,
+        query: str,
+        restaurant: Optional[str] = None,
+        category: Optional[str] = None,
+        constraints: Optional[Constraints] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[MenuRow]]:
+        return await asyncio.gather(
+            self.search_restaurants(query),
+            self.search_menu_items(query, restaurant, category, constraints=constraints),
+        )
+
+    async def search_batch(self, queries: List[str], **kwargs) -> List[Dict[str, Any]]:
+        return await self._run(self.retriever.search_batch, queries, **kwargs)
+
+    async def embed(self, texts: List[str]):
+        return await self._run(self.retriever.embeddings.embed, texts)
+
+    async def db_version(self) -> str:
+        return await self._run(self.retriever.db_version)
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        return self.retriever.list_all()
+
+    # query parsing and stats lookups are regexes over in-memory tables: cheap enough for the event loop
+    def parse_constraints(self, query: str) -> Constraints:
+        return self.retriever.parse_constraints(query)
+
+    def menu_query(self, query: str) -> Tuple[Optional[str], Optional[str], Constraints]:
+        return self.retriever.menu_query(query)
+
+    def comparison_rows(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        return self.retriever.comparison_rows(query)
+
+    def filter_candidates(self, constraints: Constraints, restaurant: Optional[str] = None) -> np.ndarray:
+        return self.retriever.filter_candidates(constraints, restaurant)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+class AsyncGenerator:
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = default_model,
+        groq_api_key: str = groq_fallback_key,
+        groq_model: str = groq_fallback_model,
+    ):
+        self.client = AsyncInferenceClient(provider=provider, api_key=api_key)
+        self.model = model_name
+        self.groq_client = AsyncGroq(api_key=groq_api_key)
+        self.groq_model = groq_model
+
+    async def generate(self, query: str, context: str, history: str) -> str:
+        messages = build_messages(query, context, history)
+        try:
+            resp = await self.client.chat.completions.create(
+                model=self.model, messages=messages, max_tokens=500
+            )
+            return resp.choices[0].message.content
+        except Exception as e:
+            print(f"Hugging Face inference failed, falling back to Groq: {e}")
+            fallback = await self.groq_client.chat.completions.create(
+                model=self.groq_model, messages=messages, max_tokens=500
+            )
+            return fallback.choices[0].message.content
+
+    async def generate_stream(self, query: str, context: str, history: str) -> AsyncIterator[str]:
+        messages = build_messages(query, context, history)
+        emitted = False
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model, messages=messages, max_tokens=500, stream=True
+            )
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    emitted = True
+                    yield token
+            return
+        except Exception as e:
+            # once tokens have reached the caller a restart on Groq would repeat them
+            if emitted:
+                raise
+            print(f"Hugging Face inference failed, falling back to Groq: {e}")
+        fallback = await self.groq_client.chat.completions.create(
+            model=self.groq_model, messages=messages, max_tokens=500, stream=True
+        )
+        async for chunk in fallback:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                yield token
+
+
+class AsyncNuggetsBot:
+    """asyncio counterpart of NuggetsBot.
+
+    One instance can serve many conversations: pass each conversation's own history
+    list to process_query / process_query_stream (the instance's chat_history is used
+    when none is given). Pass `retriever` to share an already loaded Retriever.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        db_path: str = "./public/restaurant_vector_db",
+        groq_api_key: str = groq_fallback_key,
+        groq_model: str = groq_fallback_model,
+        res_k: int = 5,
+        menu_k: int = 15,
+        answer_cache_size: int = 512,
+        answer_cache_ttl: float = 3600.0,
+        answer_cache_similarity: float = 0.95,
+        retriever: Optional[Retriever] = None,
+        max_workers: int = 8,
+        max_history: int = 50,
+    ):
+        self.retriever = AsyncRetriever(
+            retriever or Retriever(db_path, res_k=res_k, menu_k=menu_k), max_workers=max_workers
+        )
+        self.generator = AsyncGenerator(api_key=api_key, groq_api_key=groq_api_key, groq_model=groq_model)
+        self.chat_history: List[Dict[str, str]] = []
+        self.max_history = max_history
+        self.answer_cache = AnswerCache(
+            max_size=answer_cache_size, ttl=answer_cache_ttl, similarity=answer_cache_similarity
+        )
+
+    async def _build_context(self, query: str) -> str:
+        restaurant, category, constraints = self.retriever.menu_query(query)
+        restos, items = await self.retriever.search_both(query, restaurant, category, constraints)
+        filter_empty = bool(constraints) and not len(self.retriever.filter_candidates(constraints, restaurant))
+        return format_context(
+            restos, items, self.retriever.list_all(), self.retriever.comparison_rows(query), constraints, filter_empty
+        )
+
+    async def _prepare(
+        self, query: str, chat_history: List[Dict[str, str]]
+    ) -> Tuple[str, str, tuple, Optional[str]]:
+        chat_history.append({"input": query})
+        del chat_history[:-self.max_history]
+        history = format_history(chat_history[-3:])
+        # retrieval and the cache-key inputs are independent, so fetch them together
+        ctx, (emb,), version = await asyncio.gather(
+            self._build_context(query), self.retriever.embed([query]), self.retriever.db_version()
+        )
+        cache_key = (emb, _digest(ctx), _digest(format_history(chat_history[-3:-1])), version)
+        return history, ctx, cache_key, self.answer_cache.get(query, *cache_key)
+
+    async def process_query(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> str:
+        chat_history = self.chat_history if chat_history is None else chat_history
+        history, ctx, cache_key, ans = await self._prepare(query, chat_history)
+        if ans is None:
+            ans = await self.generator.generate(query, ctx, history)
+            self.answer_cache.put(query, *cache_key, ans)
+        chat_history[-1]["output"] = ans
+        return ans
+
+    async def process_query_stream(
+        self, query: str, chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        chat_history = self.chat_history if chat_history is None else chat_history
+        history, ctx, cache_key, ans = await self._prepare(query, chat_history)
+        if ans is not None:
+            chat_history[-1]["output"] = ans
+            yield ans
+            return
+        parts: List[str] = []
+        async for token in self.generator.generate_stream(query, ctx, history):
+            parts.append(token)
+            yield token
+        ans = "".join(parts)
+        self.answer_cache.put(query, *cache_key, ans)
+        chat_history[-1]["output"] = ans
@@ -0,0 +1,178 @@
+import atexit
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class EmbeddingCache:
+    """Bounded LRU of text -> embedding in front of an embedding function.
+
+    Texts are keyed by their normalised form, each call embeds only the distinct texts
+    it has not seen before (in one batch), and the cache can optionally be persisted
+    to an .npz file that is reloaded on start and rewritten at interpreter exit. A persisted
+    file is only reused by a cache with the same model_id.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List],
+        max_size: int = 4096,
+        path: Optional[str] = None,
+        model_id: str = "",
+    ):
+        self.embed_fn = embed_fn
+        self.max_size = max_size
+        self.path = path
+        self.model_id = model_id
+        self.hits = 0
+        self.misses = 0
+        self._store: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        keys = [normalize_text(t) for t in texts]
+        with self._lock:
+            missing = list(dict.fromkeys(k for k in keys if k not in self._store))
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            # embed outside the lock so concurrent callers are not serialised on the model
+            fresh = self.embed_fn(missing)
+            with self._lock:
+                for key, vec in zip(missing, fresh):
+                    self._store[key] = np.asarray(vec, dtype=np.float32)
+                    self._store.move_to_end(key)
+        with self._lock:
+            out = []
+            for key in keys:
+                vec = self._store.get(key)
+                if vec is None:  # evicted between the two critical sections
+                    vec = np.asarray(self.embed_fn([key])[0], dtype=np.float32)
+                    self._store[key] = vec
+                self._store.move_to_end(key)
+                out.append(vec)
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys, vecs = data["keys"], data["vectors"]
+                model_id = str(data["model_id"]) if "model_id" in data.files else ""
+            if model_id != self.model_id:
+                print(f"Ignoring embedding cache {self.path}: built with another embedding model")
+                return
+            with self._lock:
+                for key, vec in zip(keys.tolist()[-self.max_size:], vecs[-self.max_size:]):
+                    self._store[key] = vec
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable embedding cache {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            if not self._store:
+                return
+            keys = np.array(list(self._store.keys()))
+            vecs = np.stack(list(self._store.values()))
+        tmp = f"{self.path}.tmp{os.getpid()}.npz"
+        try:
+            np.savez(tmp, keys=keys, vectors=vecs, model_id=np.array(self.model_id))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not write embedding cache {self.path}: {e}")
+
+
+class AnswerCache:
+    """TTL + LRU cache of generated answers for NuggetsBot.
+
+    Exact tier: (normalised query, retrieved-context fingerprint, history window).
+    Semantic tier: any live entry for the same retrieved context and history window whose
+    query embedding has cosine similarity >= `similarity` with the new query (a paraphrase
+    that retrieves different items, e.g. another price bound, never matches). Every lookup
+    carries the vector DB version; when it changes (DB rebuilt or edited) the whole cache
+    is dropped.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: float = 3600.0, similarity: float = 0.95):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.similarity = similarity
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._version: Optional[str] = None
+        self._store: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (answer, unit embedding, created)
+        self._lock = threading.Lock()
+
+    def _sync(self, version: str) -> None:
+        if version != self._version:
+            self._store.clear()
+            self._version = version
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        for key in [k for k, (_, _, created) in self._store.items() if created < cutoff]:
+            del self._store[key]
+
+    def get(
+        self, query: str, embedding: np.ndarray, context_fp: str, history_fp: str, version: str
+    ) -> Optional[str]:
+        key = (normalize_text(query), context_fp, history_fp)
+        with self._lock:
+            self._sync(version)
+            self._expire()
+            entry = self._store.get(key)
+            if entry is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            candidates = [(k, e) for k, e in self._store.items() if k[1] == context_fp and k[2] == history_fp]
+            if candidates and self.similarity < 1.0:
+                unit = embedding / (np.linalg.norm(embedding) or 1.0)
+                sims = np.stack([e[1] for _, e in candidates]) @ unit
+                best = int(np.argmax(sims))
+                if sims[best] >= self.similarity:
+                    self._store.move_to_end(candidates[best][0])
+                    self.semantic_hits += 1
+                    return candidates[best][1][0]
+            self.misses += 1
+            return None
+
+    def put(
+        self, query: str, embedding: np.ndarray, context_fp: str, history_fp: str, version: str, answer: str
+    ) -> None:
+        if self.max_size <= 0:
+            return
+        key = (normalize_text(query), context_fp, history_fp)
+        unit = np.asarray(embedding, dtype=np.float32)
+        unit = unit / (np.linalg.norm(unit) or 1.0)
+        with self._lock:
+            self._sync(version)
+            self._store[key] = (answer, unit, time.monotonic())
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
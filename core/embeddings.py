@@ -0,0 +1,139 @@
+import os
+from functools import cached_property
+from typing import Any, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, Embeddings
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+
+class LocalEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """Explicit local ONNX sentence embedding, shared by ingestion (Vectorizer) and queries (Retriever).
+
+    By default this is the same all-MiniLM-L6-v2 export Chroma uses implicitly, so vectors
+    match collections built with Chroma's default embedding function. What Chroma does not
+    expose is configurable here:
+
+    - model_dir: a directory with another sentence-transformers ONNX export (model.onnx +
+      tokenizer.json), mean-pooled and L2-normalised like MiniLM
+    - batch_size: texts per ONNX run
+    - quantize: run a dynamically int8-quantized copy of the model (written next to it on
+      first use; needs the `onnx` package)
+    - intra_op_threads: ONNX Runtime threads per run (None = runtime default, all cores)
+    - max_length: tokens per text; shorter batches are only padded to their longest text
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        batch_size: int = 64,
+        quantize: bool = False,
+        intra_op_threads: Optional[int] = None,
+        max_length: int = 256,
+        preferred_providers: Optional[List[str]] = None,
+    ):
+        super().__init__(preferred_providers=preferred_providers)
+        self.model_dir = model_dir or os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        self.batch_size = batch_size
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.max_length = max_length
+
+    @property
+    def model_id(self) -> str:
+        """Identifies everything that changes the vectors, e.g. to key persisted embedding caches."""
+        name = self.MODEL_NAME if self.model_dir == os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME) else self.model_dir
+        return f"{name}|{'int8' if self.quantize else 'fp32'}|{self.max_length}"
+
+    def _model_file(self) -> str:
+        model_path = os.path.join(self.model_dir, "model.onnx")
+        if not self.quantize:
+            return model_path
+        quantized_path = os.path.join(self.model_dir, "model.int8.onnx")
+        if not os.path.exists(quantized_path):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError as e:
+                raise ValueError(
+                    "int8 quantization needs the onnx package. Please install it with `pip install onnx`"
+                ) from e
+            tmp = f"{quantized_path}.tmp{os.getpid()}"
+            quantize_dynamic(model_path, tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, quantized_path)
+        return quantized_path
+
+    @cached_property
+    def tokenizer(self) -> Any:
+        tokenizer = self.Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_length)
+        # pad each batch to its own longest text rather than always to max_length
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        return tokenizer
+
+    @cached_property
+    def model(self) -> Any:
+        providers = self._preferred_providers or self.ort.get_available_providers()
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            so.intra_op_num_threads = self.intra_op_threads
+            so.inter_op_num_threads = 1
+        return self.ort.InferenceSession(
+            self._model_file(),
+            providers=[p for p in providers if p != "CoreMLExecutionProvider"],
+            sess_options=so,
+        )
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Mean-pooled, L2-normalised float32 embeddings of one batch of texts."""
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if any(i.name == "token_type_ids" for i in self.model.get_inputs()):
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.model.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        if self.model_dir == os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME):
+            self._download_model_if_not_exists()
+        texts = list(input)
+        out: List[np.ndarray] = []
+        for start in range(0, len(texts), self.batch_size):
+            out.extend(self.embed_batch(texts[start:start + self.batch_size]))
+        return out
+
+
+def check_embedding_consistency(collection, embedding_function, sample: int = 3, min_similarity: float = 0.98) -> float:
+    """Re-embed a few stored documents with embedding_function and compare with their stored vectors.
+
+    Returns the lowest cosine similarity (1.0 for an empty collection) and raises ValueError when
+    it is below min_similarity, i.e. when queries would be embedded differently from the index
+    (another model, or different pooling); int8 vs fp32 of the same model stays above 0.98.
+    """
+    stored = collection.get(limit=sample, include=["documents", "embeddings"])
+    documents = stored["documents"] or []
+    if not documents:
+        return 1.0
+    index_vecs = np.asarray(stored["embeddings"], dtype=np.float32)
+    query_vecs = np.asarray(embedding_function(documents), dtype=np.float32)
+    if index_vecs.shape != query_vecs.shape:
+        raise ValueError(
+            f"Collection '{collection.name}' holds {index_vecs.shape[1]}-d embeddings but the "
+            f"embedding function produces {query_vecs.shape[1]}-d ones"
+        )
+    sims = np.sum(index_vecs * query_vecs, axis=1) / (
+        np.linalg.norm(index_vecs, axis=1) * np.linalg.norm(query_vecs, axis=1) + 1e-12
+    )
+    worst = float(sims.min())
+    if worst < min_similarity:
+        raise ValueError(
+            f"Embeddings in collection '{collection.name}' do not match the configured embedding "
+            f"function (cosine similarity {worst:.3f} < {min_similarity}); rebuild the index with it"
+        )
+    return worst
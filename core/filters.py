@@ -0,0 +1,205 @@
+import re
+import sys
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.menu_store import MenuStore
+
+# a number followed by a distance, rating, headcount or time unit is never a price
+_NOT_UNIT = (
+    r"(?!\d|\.\d)(?!\s*(?:km|kms|kilomet(?:er|re)s?|miles?|m|mins?|minutes?|hours?|hrs?"
+    r"|am|pm|o'?clock|stars?|ratings?|people|persons?|guests?|pax)\b)"
+)
+_AMOUNT = rf"(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d+)?){_NOT_UNIT}"
+_PRICE_BETWEEN = re.compile(rf"\b(?:between|from)\s*{_AMOUNT}\s*(?:and|to|-)\s*{_AMOUNT}", re.IGNORECASE)
+_PRICE_RANGE = re.compile(r"(?:₹|\brs\.?)\s*(\d+(?:\.\d+)?)\s*(?:-|to)\s*(?:₹|rs\.?)?\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_PRICE_MAX = re.compile(
+    rf"(?:\b(?:under|below|less than|cheaper than|within|up ?to|at most|max(?:imum)?|not more than)|<=?)\s*{_AMOUNT}",
+    re.IGNORECASE,
+)
+_PRICE_MIN = re.compile(
+    rf"(?:\b(?:over|above|more than|costlier than|at least|min(?:imum)?|starting at)|>=?)\s*{_AMOUNT}", re.IGNORECASE
+)
+# a bound right after a rating word ("rated above 4", "rating between 4 and 5") is not a price
+_RATING_BEFORE = re.compile(r"\b(?:rated|ratings?|stars?|reviews?)(?:\s+(?:of|is|at))?\s*$", re.IGNORECASE)
+_NON_VEG = re.compile(r"\bnon[\s-]?veg(?:etarian)?\b", re.IGNORECASE)
+_VEG = re.compile(r"\b(?:veg|vegetarian|veggie)\b", re.IGNORECASE)
+
+# course words in questions -> patterns over the lower-cased scraped (free-form, CamelCase)
+# category names; dish words ("biryani", "kebab") are left to the semantic search since many
+# dishes sit in generic categories like MainCourse
+COURSE_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "dessert": ("dessert", r"^sweets?$"),
+    "sweet": ("dessert", r"^sweets?$"),
+    "starter": ("starter",),
+    "appetizer": ("starter",),
+    "main": ("maincourse",),
+    "main course": ("maincourse",),
+    "drink": ("beverage", "chai", "drink"),
+    "beverage": ("beverage", "chai", "drink"),
+    "soup": ("soup",),
+    "bread": ("bread",),
+    "snack": ("snack",),
+    "breakfast": ("breakfast",),
+    "thali": ("thali",),
+}
+_COURSE = re.compile(
+    r"\b(" + "|".join(sorted((re.escape(w) for w in COURSE_ALIASES), key=len, reverse=True)) + r")s?\b",
+    re.IGNORECASE,
+)
+
+
+class Constraints(NamedTuple):
+    """Structured constraints on menu items; empty fields do not filter."""
+
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    veg_status: Optional[str] = None
+    categories: Tuple[str, ...] = ()
+    restaurants: Tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return any(v not in (None, ()) for v in self)
+
+    def describe(self) -> str:
+        parts = []
+        if self.veg_status:
+            parts.append(self.veg_status)
+        if self.min_price is not None and self.max_price is not None:
+            parts.append(f"₹{self.min_price:.0f}-₹{self.max_price:.0f}")
+        elif self.max_price is not None:
+            parts.append(f"up to ₹{self.max_price:.0f}")
+        elif self.min_price is not None:
+            parts.append(f"from ₹{self.min_price:.0f}")
+        if self.categories:
+            parts.append("categories " + ", ".join(self.categories))
+        if self.restaurants:
+            parts.append("at " + " or ".join(self.restaurants))
+        return "; ".join(parts)
+
+
+def _price_match(pattern: re.Pattern, query: str) -> Optional[re.Match]:
+    """First match of pattern whose number is not a rating (distances and times fail _NOT_UNIT)."""
+    for m in pattern.finditer(query):
+        if not _RATING_BEFORE.search(query, 0, m.start()):
+            return m
+    return None
+
+
+def parse_price(query: str) -> Tuple[Optional[float], Optional[float]]:
+    m = _price_match(_PRICE_BETWEEN, query) or _PRICE_RANGE.search(query)
+    if m:
+        lo, hi = sorted((float(m.group(1)), float(m.group(2))))
+        return lo, hi
+    lo_m, hi_m = _price_match(_PRICE_MIN, query), _price_match(_PRICE_MAX, query)
+    return (float(lo_m.group(1)) if lo_m else None), (float(hi_m.group(1)) if hi_m else None)
+
+
+def parse_veg(query: str) -> Optional[str]:
+    non_veg = bool(_NON_VEG.search(query))
+    veg = bool(_VEG.search(_NON_VEG.sub(" ", query)))
+    if non_veg == veg:
+        return None  # neither, or "veg and non-veg": no constraint
+    return "non-veg" if non_veg else "veg"
+
+
+class MenuFilter:
+    """Evaluates Constraints as NumPy masks over a MenuStore's price and dictionary-encoded columns.
+
+    Masks and candidate row ids index the store's rows, which are also the lexical index's
+    doc ids, so no per-item Python objects are touched while filtering.
+    """
+
+    def __init__(self, store: MenuStore):
+        self.store = store
+        self.n = len(store)
+        self.price = store.price
+        self.veg_values, self.veg = store.column("veg_status")
+        self.category_values, self.category = store.column("category")
+        self.restaurant_values, self.restaurant = store.column("restaurant_name")
+        self._category_lower = [str(c).lower() for c in self.category_values]
+
+    def _codes(self, key: str, wanted: Sequence[str]) -> np.ndarray:
+        codes = (self.store.code(key, w) for w in wanted)
+        return np.array([c for c in codes if c is not None], dtype=np.int32)
+
+    def match_categories(self, query: str) -> Tuple[str, ...]:
+        """Category names for the course words in query (e.g. "desserts" -> Desserts, DessertsandBeverages)."""
+        patterns = {p for m in _COURSE.finditer(query) for p in COURSE_ALIASES[m.group(1).lower()]}
+        return tuple(
+            name
+            for name, lower in zip(self.category_values, self._category_lower)
+            if any(re.search(p, lower) for p in patterns)
+        )
+
+    def parse(self, query: str, restaurants: Sequence[str] = ()) -> Constraints:
+        min_price, max_price = parse_price(query)
+        return Constraints(
+            min_price=min_price,
+            max_price=max_price,
+            veg_status=parse_veg(query),
+            categories=self.match_categories(query),
+            restaurants=tuple(restaurants),
+        )
+
+    def mask(self, constraints: Constraints) -> np.ndarray:
+        mask = np.ones(self.n, dtype=bool)
+        if constraints.min_price is not None or constraints.max_price is not None:
+            mask &= self.price > 0  # unpriced items cannot satisfy a price bound
+            if constraints.min_price is not None:
+                mask &= self.price >= constraints.min_price
+            if constraints.max_price is not None:
+                mask &= self.price <= constraints.max_price
+        if constraints.veg_status:
+            mask &= np.isin(self.veg, self._codes("veg_status", [constraints.veg_status]))
+        if constraints.categories:
+            mask &= np.isin(self.category, self._codes("category", constraints.categories))
+        if constraints.restaurants:
+            mask &= np.isin(self.restaurant, self._codes("restaurant_name", constraints.restaurants))
+        return mask
+
+    def candidates(self, constraints: Constraints) -> np.ndarray:
+        """Row ids (int64, ascending) of the menu items satisfying constraints."""
+        return np.flatnonzero(self.mask(constraints)).astype(np.int64)
+
+
+# (question, (min_price, max_price), veg_status): phrasings the parsers must keep handling
+EXAMPLES = [
+    ("veg dishes under 200 at Moti Mahal", (None, 200.0), "veg"),
+    ("veg dishes under ₹200 at Moti Mahal", (None, 200.0), "veg"),
+    ("biryani under 300", (None, 300.0), None),
+    ("dishes above 500", (500.0, None), None),
+    ("items above rs 500", (500.0, None), None),
+    ("mains under 300 rupees", (None, 300.0), None),
+    ("cheaper than 250", (None, 250.0), None),
+    ("non-veg starters between 100 and 300", (100.0, 300.0), "non-veg"),
+    ("desserts ₹100-250", (100.0, 250.0), None),
+    ("dinner for 4 people under ₹2000", (None, 2000.0), None),
+    ("restaurants rated above 4", (None, None), None),
+    ("rating above 4.5 and under 400", (None, 400.0), None),
+    ("restaurants rated between 4 and 5", (None, None), None),
+    ("places with 4 stars and above", (None, None), None),
+    ("within 2 km of Hazratganj", (None, None), None),
+    ("open from 10 to 11 pm", (None, None), None),
+    ("veg and non-veg thali", (None, None), None),
+    ("vegetarian food", (None, None), "veg"),
+    ("non vegetarian kebabs", (None, None), "non-veg"),
+]
+
+
+def check() -> int:
+    """Run parse_price / parse_veg over EXAMPLES, print mismatches and return how many there were."""
+    failures = 0
+    for query, price, veg in EXAMPLES:
+        got = parse_price(query), parse_veg(query)
+        if got != (price, veg):
+            failures += 1
+            print(f"MISMATCH {query!r}: got {got}, expected {(price, veg)}")
+    print(f"{len(EXAMPLES) - failures}/{len(EXAMPLES)} filter examples parse as expected")
+    return failures
+
+
+if __name__ == "__main__":
+    # python -m core.filters: offline check of the query parsers, exits 1 on a mismatch
+    sys.exit(1 if check() else 0)
@@ -0,0 +1,68 @@
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# A bucket is one ranked hit list from a single retriever together with its raw scores.
+# `higher_is_better` is False for distance-like scores (Chroma) and True for lexical ones.
+Bucket = Tuple[List[Dict[str, Any]], Sequence[float], bool]
+
+
+def fuse_scores(
+    buckets: List[Bucket],
+    key: Callable[[Dict[str, Any]], str],
+    k: int,
+    method: str = "rrf",
+    weights: Optional[Sequence[float]] = None,
+    rrf_k: int = 60,
+    min_score: Optional[float] = None,
+) -> List[Tuple[Dict[str, Any], float]]:
+    """Merge ranked buckets into one list of (item, score), best first.
+
+    method="rrf" sums w / (rrf_k + rank) over the buckets an item appears in;
+    method="weighted" min-max normalises each bucket's raw scores to [0, 1] and sums w * score.
+    """
+    if method not in ("rrf", "weighted"):
+        raise ValueError(f"Unknown fusion method: {method}")
+    weights = list(weights) if weights is not None else [1.0] * len(buckets)
+    if len(weights) != len(buckets):
+        raise ValueError(f"Got {len(weights)} fusion weights for {len(buckets)} buckets")
+
+    # assign every distinct item a row, remembering the first payload seen for it
+    rows: Dict[str, int] = {}
+    items: List[Dict[str, Any]] = []
+    for hits, _, _ in buckets:
+        for item in hits:
+            if key(item) not in rows:
+                rows[key(item)] = len(items)
+                items.append(item)
+    if not items or k <= 0:
+        return []
+
+    ranks = np.full((len(items), len(buckets)), np.inf)
+    norm = np.zeros((len(items), len(buckets)))
+    for col, (hits, scores, higher_is_better) in enumerate(buckets):
+        if not hits:
+            continue
+        idx = np.fromiter((rows[key(item)] for item in hits), dtype=np.int64, count=len(hits))
+        raw = np.asarray(scores, dtype=np.float64)
+        if not higher_is_better:
+            raw = -raw
+        # the same item can appear twice in a bucket (e.g. duplicate names); keep its best rank/score
+        np.minimum.at(ranks[:, col], idx, np.arange(1, len(hits) + 1, dtype=np.float64))
+        span = raw.max() - raw.min()
+        scaled = (raw - raw.min()) / span if span > 0 else np.ones_like(raw)
+        np.maximum.at(norm[:, col], idx, scaled)
+
+    w = np.asarray(weights, dtype=np.float64)
+    if method == "rrf":
+        fused = (w / (rrf_k + ranks)).sum(axis=1)
+    else:
+        fused = (norm * w).sum(axis=1)
+
+    if min_score is not None:
+        candidates = np.flatnonzero(fused >= min_score)
+    else:
+        candidates = np.arange(len(items))
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-fused[candidates], k - 1)[:k]]
+    order = candidates[np.argsort(-fused[candidates], kind="stable")]
+    return [(items[i], float(fused[i])) for i in order]
@@ -0,0 +1,93 @@
+import re
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_token_re = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _token_re.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed corpus, stored as CSR postings of integer doc ids.
+
+    Term t's postings live in doc_ids[offsets[t]:offsets[t + 1]] (with matching tfs),
+    so the whole index is a handful of flat numpy arrays plus the term -> id dict.
+    """
+
+    def __init__(self, docs: Iterable[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_of: List[int] = []
+        lengths: List[int] = []
+        for doc_id, text in enumerate(docs):
+            toks = tokenize(text)
+            lengths.append(len(toks))
+            for tok in toks:
+                term_ids.append(self.vocab.setdefault(tok, len(self.vocab)))
+                doc_of.append(doc_id)
+
+        self.n_docs = len(lengths)
+        self.doc_len = np.asarray(lengths, dtype=np.float32)
+        terms = np.asarray(term_ids, dtype=np.int64)
+        docs_arr = np.asarray(doc_of, dtype=np.int64)
+
+        # collapse (term, doc) pairs into postings with term frequencies, sorted by term then doc
+        pair = np.unique(terms * max(self.n_docs, 1) + docs_arr, return_counts=True)
+        codes, counts = pair
+        post_terms = codes // max(self.n_docs, 1)
+        self.doc_ids = (codes % max(self.n_docs, 1)).astype(np.int32)
+        self.tfs = counts.astype(np.float32)
+        self.offsets = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.add.at(self.offsets, post_terms + 1, 1)
+        np.cumsum(self.offsets, out=self.offsets)
+        self._finalize()
+
+    def _finalize(self) -> None:
+        df = np.diff(self.offsets).astype(np.float32)
+        self.idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(self.doc_len.mean()) if self.n_docs else 0.0
+        # per-doc length normaliser k1 * (1 - b + b * |d| / avgdl), computed once
+        self._norm = (self.k1 * (1 - self.b + self.b * self.doc_len / (avgdl or 1.0))).astype(np.float32)
+
+    _arrays = ("doc_ids", "tfs", "offsets", "doc_len", "idf", "_norm")
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Split the index into a JSON-able table and flat arrays (see core.snapshot)."""
+        terms = sorted(self.vocab, key=self.vocab.__getitem__)
+        table = {"k1": self.k1, "b": self.b, "n_docs": self.n_docs, "terms": terms}
+        return table, {name: getattr(self, name) for name in self._arrays}
+
+    @classmethod
+    def from_state(cls, table: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "BM25Index":
+        index = cls.__new__(cls)
+        index.k1, index.b, index.n_docs = table["k1"], table["b"], table["n_docs"]
+        index.vocab = {term: i for i, term in enumerate(table["terms"])}
+        for name in cls._arrays:
+            setattr(index, name, arrays[name])
+        return index
+
+    def search(
+        self, query: str, k: int, candidates: Optional[np.ndarray] = None, min_score: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """Top-k (doc_id, score) for query, optionally restricted to a candidate doc-id array."""
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or k <= 0:
+            return []
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for t in term_ids:
+            lo, hi = self.offsets[t], self.offsets[t + 1]
+            docs, tf = self.doc_ids[lo:hi], self.tfs[lo:hi]
+            scores[docs] += self.idf[t] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+
+        if candidates is not None:
+            hits = candidates[scores[candidates] > min_score]
+        else:
+            hits = np.flatnonzero(scores > min_score)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(d), float(scores[d])) for d in hits]
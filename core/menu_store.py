@@ -0,0 +1,175 @@
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_MISSING = -1  # code of a key that is absent on a row
+_ABSENT = object()
+
+
+def _pack(strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate strings into one utf-8 byte array plus int64 offsets (string i = data[off[i]:off[i + 1]])."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets
+
+
+class MenuRow:
+    """Read-only view of one MenuStore row; reads like the metadata dict it replaces."""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: "MenuStore", row: int):
+        self.store = store
+        self.row = row
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.value(self.row, key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.store.value(self.row, key, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.store.value(self.row, key, _ABSENT) is not _ABSENT
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.store.row_dict(self.row)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, MenuRow) and other.store is self.store and other.row == self.row
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.row))
+
+    def __repr__(self) -> str:
+        return f"MenuRow({self.row}, {self.to_dict()!r})"
+
+
+class MenuStore:
+    """Columnar, read-only table of the menu item metadata, addressed by integer row id.
+
+    Rows keep the order they were loaded in. Chroma ids are kept sorted as a fixed-width
+    byte column (with the row of each, and each row's position) so query results map back
+    to row ids by binary search. Names are packed utf-8 strings (one byte array +
+    offsets); price is a float64 column; every other metadata key
+    (restaurant_name, category, veg_status, ...) is dictionary-encoded as int32 codes into
+    a list of its distinct values (-1 = key missing on that row). All columns are flat
+    numpy arrays, so the store is snapshotted and memory-mapped like the lexical indexes.
+    Rows are handed out as MenuRow views.
+    """
+
+    def __init__(self, ids: Sequence[str], rows: Sequence[Dict[str, Any]]):
+        self.n = len(rows)
+        encoded_ids = np.array([i.encode("utf-8") for i in ids] or [b""], dtype=bytes)[:self.n]
+        self.id_rows = np.argsort(encoded_ids, kind="stable").astype(np.int32)
+        self.sorted_ids = encoded_ids[self.id_rows]
+        self.id_pos = np.empty(self.n, dtype=np.int32)
+        self.id_pos[self.id_rows] = np.arange(self.n, dtype=np.int32)
+        self.name_data, self.name_offsets = _pack([r.get("name", "") for r in rows])
+        # a missing or None price reads back as 0, like the Vectorizer writes it
+        self.price = np.array([r.get("price") or 0 for r in rows], dtype=np.float64)
+
+        keys = sorted({k for r in rows for k in r} - {"name", "price"})
+        self.values: Dict[str, List[Any]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for key in keys:
+            index: Dict[Any, int] = {}
+            codes = np.fromiter(
+                (index.setdefault(r[key], len(index)) if key in r else _MISSING for r in rows),
+                dtype=np.int32,
+                count=self.n,
+            )
+            self.values[key] = list(index)
+            self.codes[key] = codes
+        self._finalize()
+
+    def _finalize(self) -> None:
+        self._lookup: Dict[str, Dict[Any, int]] = {
+            key: {v: i for i, v in enumerate(values)} for key, values in self.values.items()
+        }
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, row: int) -> MenuRow:
+        return MenuRow(self, int(row))
+
+    def __iter__(self) -> Iterator[MenuRow]:
+        return (MenuRow(self, i) for i in range(self.n))
+
+    def rows(self, row_ids: Sequence[int]) -> List[MenuRow]:
+        return [MenuRow(self, int(i)) for i in row_ids]
+
+    def name(self, row: int) -> str:
+        return self.name_data[self.name_offsets[row]:self.name_offsets[row + 1]].tobytes().decode("utf-8")
+
+    def chroma_ids(self, row_ids: Sequence[int]) -> List[str]:
+        return [self.sorted_ids[self.id_pos[int(i)]].decode("utf-8") for i in row_ids]
+
+    def row_ids(self, ids: Sequence[str]) -> List[Optional[int]]:
+        """Row id of each Chroma id (None if the id is not in the store)."""
+        keys = np.array([i.encode("utf-8") for i in ids] or [b""], dtype=bytes)[:len(ids)]
+        pos = np.searchsorted(self.sorted_ids, keys)
+        return [
+            int(self.id_rows[p]) if p < self.n and self.sorted_ids[p] == key else None for p, key in zip(pos, keys)
+        ]
+
+    def value(self, row: int, key: str, default: Any = None) -> Any:
+        if key == "name":
+            return self.name(row)
+        if key == "price":
+            price = float(self.price[row])
+            return int(price) if price.is_integer() else price
+        codes = self.codes.get(key)
+        if codes is None or codes[row] == _MISSING:
+            return default
+        return self.values[key][codes[row]]
+
+    def row_dict(self, row: int) -> Dict[str, Any]:
+        out = {"name": self.name(row), "price": self.value(row, "price")}
+        for key, codes in self.codes.items():
+            if codes[row] != _MISSING:
+                out[key] = self.values[key][codes[row]]
+        return out
+
+    def column(self, key: str) -> Tuple[List[Any], np.ndarray]:
+        """(distinct values, int32 codes) of a dictionary-encoded column; empty if no row has the key."""
+        if key not in self.codes:
+            return [], np.full(self.n, _MISSING, dtype=np.int32)
+        return self.values[key], self.codes[key]
+
+    def code(self, key: str, value: Any) -> Optional[int]:
+        return self._lookup.get(key, {}).get(value)
+
+    def where(self, key: str, value: Any) -> np.ndarray:
+        """Row ids (int64, ascending) whose key equals value."""
+        code = self.code(key, value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.codes[key] == code).astype(np.int64)
+
+    def state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Split the store into a JSON-able table and flat arrays (see core.snapshot)."""
+        arrays = {
+            "sorted_ids": self.sorted_ids,
+            "id_rows": self.id_rows,
+            "id_pos": self.id_pos,
+            "name_data": self.name_data,
+            "name_offsets": self.name_offsets,
+            "price": self.price,
+        }
+        arrays.update({f"codes.{key}": codes for key, codes in self.codes.items()})
+        return {"n": self.n, "values": self.values}, arrays
+
+    @classmethod
+    def from_state(cls, table: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "MenuStore":
+        store = cls.__new__(cls)
+        store.n = table["n"]
+        store.values = table["values"]
+        for name in ("sorted_ids", "id_rows", "id_pos", "name_data", "name_offsets", "price"):
+            setattr(store, name, arrays[name])
+        store.codes = {key: arrays[f"codes.{key}"] for key in store.values}
+        store._finalize()
+        return store
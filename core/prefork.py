@@ -0,0 +1,187 @@
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """Resident / proportional / shared memory of a process in bytes (Linux /proc)."""
+    usage = {"rss": 0, "pss": 0, "shared": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, rest = line.partition(":")
+                kb = int(rest.split()[0]) * 1024 if rest.split() and rest.split()[0].isdigit() else 0
+                if field == "Rss":
+                    usage["rss"] = kb
+                elif field == "Pss":
+                    usage["pss"] = kb
+                elif field in ("Shared_Clean", "Shared_Dirty"):
+                    usage["shared"] += kb
+    except OSError:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                _, resident, shared = (int(x) for x in f.read().split()[:3])
+            page = os.sysconf("SC_PAGE_SIZE")
+            usage.update(rss=resident * page, shared=shared * page)
+        except OSError:
+            pass
+    return usage
+
+
+def build_snapshot(db_path: str) -> None:
+    """Bring the Retriever snapshot for db_path up to date in a short-lived child process.
+
+    Chroma's native client is not fork-safe once opened, so the supervising parent must
+    never open it itself; it only maps the snapshot the child leaves behind.
+    """
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            from core.rag_agent import Retriever
+            Retriever(db_path, use_snapshot=True)
+        except Exception as e:
+            print(f"[supervisor] snapshot build failed: {e}")
+            status = 1
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise RuntimeError(f"Could not build the retriever snapshot for {db_path}")
+
+
+class PreforkSupervisor:
+    """Fork `workers` processes that serve on one shared listening socket and keep them alive.
+
+    Anything the parent holds before run() - typically the Retriever snapshot, whose BM25
+    and menu store arrays are mmapped and whose remaining tables are plain Python objects -
+    is inherited copy-on-write, so it is read from disk once. Each worker runs
+    worker_main(sock), which opens its own Chroma client (never opened in the parent) and
+    serves until killed. Dead workers are restarted; per-worker memory is logged every
+    report_interval seconds.
+
+    A worker that dies within min_uptime seconds of starting counts as a quick failure:
+    its slot is restarted after an exponential backoff (restart_delay doubling up to
+    max_restart_delay), and after max_quick_failures in a row the supervisor stops all
+    workers and raises, since a worker that cannot start (bad DB path, missing model)
+    would otherwise be respawned forever.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        worker_main: Callable[[socket.socket], None],
+        workers: int,
+        report_interval: float = 60.0,
+        min_uptime: float = 10.0,
+        restart_delay: float = 0.5,
+        max_restart_delay: float = 30.0,
+        max_quick_failures: int = 5,
+    ):
+        self.sock = sock
+        self.worker_main = worker_main
+        self.workers = workers
+        self.report_interval = report_interval
+        self.min_uptime = min_uptime
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_quick_failures = max_quick_failures
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self._started: Dict[int, float] = {}  # slot -> start time of its current worker
+        self._quick_failures: Dict[int, int] = {}  # slot -> consecutive quick failures
+        self._pending: Dict[int, float] = {}  # slot -> time its restart is due
+        self._stopping = False
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            self._started[slot] = time.monotonic()
+            return
+        # worker
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        status = 0
+        try:
+            self.worker_main(self.sock)
+        except Exception as e:
+            print(f"[worker {slot}] crashed: {e}")
+            status = 1
+        finally:
+            os._exit(status)
+
+    def _schedule_restart(self, slot: int, pid: int, status: int) -> None:
+        uptime = time.monotonic() - self._started.get(slot, 0.0)
+        if uptime >= self.min_uptime:
+            self._quick_failures[slot] = 0
+            print(f"[supervisor] worker {slot} (pid {pid}) exited with status {status}; restarting")
+            self._pending[slot] = time.monotonic()
+            return
+        failures = self._quick_failures.get(slot, 0) + 1
+        self._quick_failures[slot] = failures
+        if failures >= self.max_quick_failures:
+            raise RuntimeError(
+                f"worker {slot} exited within {self.min_uptime:.0f}s of starting {failures} times in a row; giving up"
+            )
+        delay = min(self.restart_delay * 2 ** (failures - 1), self.max_restart_delay)
+        print(
+            f"[supervisor] worker {slot} (pid {pid}) exited with status {status} after {uptime:.1f}s; "
+            f"restarting in {delay:.1f}s"
+        )
+        self._pending[slot] = time.monotonic() + delay
+
+    def _stop(self, *_) -> None:
+        self._stopping = True
+
+    def report(self) -> None:
+        for pid, slot in sorted(self.children.items(), key=lambda x: x[1]):
+            mem = memory_usage(pid)
+            print(
+                f"[supervisor] worker {slot} pid={pid} rss={mem['rss'] / 2**20:.1f}MB "
+                f"pss={mem['pss'] / 2**20:.1f}MB shared={mem['shared'] / 2**20:.1f}MB"
+            )
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+        # move everything allocated so far out of the GC's reach so collections in the
+        # workers do not touch (and so un-share) the parent's pages
+        gc.collect()
+        gc.freeze()
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        last_report = time.monotonic()
+        try:
+            while not self._stopping:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    pid = 0
+                if pid and pid in self.children:
+                    self._schedule_restart(self.children.pop(pid), pid, status)
+                now = time.monotonic()
+                for slot, due in list(self._pending.items()):
+                    if due <= now:
+                        del self._pending[slot]
+                        self._spawn(slot)
+                if time.monotonic() - last_report >= self.report_interval:
+                    self.report()
+                    last_report = time.monotonic()
+                time.sleep(0.5)
+        finally:
+            for pid in list(self.children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in list(self.children):
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            self.children.clear()
+            self.sock.close()
@@ -1,8 +1,18 @@
 from huggingface_hub import InferenceClient
 from groq import Groq
 import chromadb
-from typing import Dict, List, Any, Optional
-import warnings, re
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import warnings, re, os, time, hashlib, json
+import numpy as np
+
+from core.cache import AnswerCache, EmbeddingCache
+from core.embeddings import LocalEmbeddingFunction, check_embedding_consistency
+from core.filters import Constraints, MenuFilter
+from core.fusion import Bucket, fuse_scores
+from core.lexical import BM25Index
+from core.menu_store import MenuRow, MenuStore
+from core.snapshot import collection_fingerprint, load_snapshot, same_fingerprint, save_snapshot
+from core.stats import compute_restaurant_stats, format_comparison, load_stats
 
 warnings.filterwarnings("ignore")  # removes deprecation warnings
 
@@ -12,75 +22,447 @@ default_model = 'meta-llama/Llama-3.3-70B-Instruct'
 groq_fallback_key = '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'
 groq_fallback_model = 'llama3-70b-8192'
 
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def default_snapshot_path(db_path: str) -> str:
+    return os.path.normpath(db_path) + ".snapshot"
+
+
+def _prefixed(arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    return {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+
+
 class Retriever:
-    def __init__(self, db_path: str = "./public/restaurant_vector_db"):
+    def __init__(
+        self,
+        db_path: str = "./public/restaurant_vector_db",
+        res_k: int = 5,
+        menu_k: int = 15,
+        max_res_distance: Optional[float] = None,
+        max_menu_distance: Optional[float] = None,
+        min_lexical_score: float = 0.0,
+        fusion: str = "rrf",
+        res_fusion_weights: Optional[List[float]] = None,
+        menu_fusion_weights: Optional[List[float]] = None,
+        min_score: Optional[float] = None,
+        snapshot_path: Optional[str] = None,
+        use_snapshot: bool = True,
+        preload_batch_size: int = 5_000,
+        version_check_interval: float = 5.0,
+        shared_state: Optional[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, np.ndarray]]] = None,
+        embedding_function=None,
+        embedding_cache_size: int = 4096,
+        embedding_cache_path: Optional[str] = None,
+        check_embeddings: bool = True,
+    ):
         self.client = chromadb.PersistentClient(path=db_path)
         self.res_col = self.client.get_collection("restaurants")
         self.menu_col = self.client.get_collection("menu_items")
 
-        # preload everything
-        self._all_restaurants = self.res_col.query(
-            query_texts=[""], n_results=10_000, where={"type": "restaurant"}
-        )["metadatas"][0]
-        self._all_menu = self.menu_col.query(
-            query_texts=[""], n_results=50_000, where={"type": "menu_item"}
-        )["metadatas"][0]
-
-        # inverted indexes
-        self._res_index: Dict[str, List[Dict[str, Any]]] = {}
-        for r in self._all_restaurants:
-            for tok in set(re.findall(r"\w+", " ".join([r.get("name", ""), r.get("location", ""), r.get("cuisine", "")]).lower())):
-                self._res_index.setdefault(tok, []).append(r)
-        self._menu_index: Dict[str, List[Dict[str, Any]]] = {}
-        for m in self._all_menu:
-            for tok in set(re.findall(r"\w+", " ".join([m.get("name", ""), m.get("category", "")]).lower())):
-                self._menu_index.setdefault(tok, []).append(m)
-
-    def _inverted_search(self, index: Dict[str, List[Dict[str, Any]]], query: str) -> List[Dict[str, Any]]:
-        scores: Dict[str, List[Any]] = {}
-        for tok in set(re.findall(r"\w+", query.lower())):
-            for item in index.get(tok, []):
-                key = item.get("name", "") + "|" + item.get("restaurant_name", item.get("location", ""))
-                scores.setdefault(key, [item, 0])[1] += 1
-        return [entry[0] for entry in sorted(scores.values(), key=lambda x: x[1], reverse=True)]
-
-    def search_restaurants(self, query: str) -> List[Dict[str, Any]]:
-        vec = self.res_col.query(
-            query_texts=[query], n_results=len(self._all_restaurants), where={"type": "restaurant"}
-        )["metadatas"][0]
-        inv = self._inverted_search(self._res_index, query)
-        combined, seen = [], set()
-        for r in vec + inv:
-            name = r.get("name")
-            if name and name not in seen:
-                combined.append(r)
-                seen.add(name)
-        return combined
+        # top-k per collection and score thresholds (None = no distance cut-off)
+        self.res_k = res_k
+        self.menu_k = menu_k
+        self.max_res_distance = max_res_distance
+        self.max_menu_distance = max_menu_distance
+        self.min_lexical_score = min_lexical_score
+
+        # how the buckets are merged (see core.fusion.fuse_scores); restaurant searches fuse
+        # [vector, lexical], menu searches [vector, category, lexical], so each has its own weights
+        self.fusion = fusion
+        self.res_fusion_weights = res_fusion_weights
+        self.menu_fusion_weights = menu_fusion_weights
+        for name, weights, n in (("res_fusion_weights", res_fusion_weights, 2), ("menu_fusion_weights", menu_fusion_weights, 3)):
+            if weights is not None and len(weights) != n:
+                raise ValueError(f"{name} needs {n} weights, got {len(weights)}")
+        self.min_score = min_score
+
+        self.preload_batch_size = preload_batch_size
+
+        # query embeddings are computed here (once per distinct text) and handed to Chroma;
+        # the index must have been built with the same model (see core.embeddings)
+        self.embedding_function = embedding_function or LocalEmbeddingFunction()
+        if check_embeddings:
+            check_embedding_consistency(self.menu_col, self.embedding_function)
+        self.embeddings = EmbeddingCache(
+            self.embedding_function,
+            max_size=embedding_cache_size,
+            path=embedding_cache_path,
+            model_id=getattr(self.embedding_function, "model_id", ""),
+        )
+
+        # metadata tables + lexical indexes come from the on-disk snapshot when it is current;
+        # shared_state is an already read snapshot (fingerprint, tables, arrays), e.g. one a
+        # pre-fork parent mapped once for all of its workers
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path or default_snapshot_path(db_path)
+        self.fingerprint = collection_fingerprint(db_path, [self.res_col, self.menu_col])
+        self.version_check_interval = version_check_interval
+        self._version = _digest(json.dumps(self.fingerprint, sort_keys=True))
+        self._version_checked = time.monotonic()
+        snap = None
+        if shared_state and same_fingerprint(shared_state[0], self.fingerprint):
+            snap = shared_state[1], shared_state[2]
+        elif use_snapshot:
+            snap = load_snapshot(self.snapshot_path, self.fingerprint)
+        if snap:
+            tables, arrays = snap
+            self._all_restaurants = tables["restaurants"]
+            self.menu_store = MenuStore.from_state(tables["menu_store"], _prefixed(arrays, "menu_store."))
+            self._res_index = BM25Index.from_state(tables["res_index"], _prefixed(arrays, "res_index."))
+            self._menu_index = BM25Index.from_state(tables["menu_index"], _prefixed(arrays, "menu_index."))
+        else:
+            self._preload()
+            if use_snapshot:
+                self.save_snapshot()
+
+        self._restaurant_names = {r.get("name", "").lower(): r.get("name", "") for r in self._all_restaurants}
+
+        # per-restaurant aggregates for comparisons: the table the Vectorizer stored with the
+        # DB if it matches the collections, else computed from the preloaded rows
+        self.stats = load_stats(db_path, self.fingerprint) or compute_restaurant_stats(
+            self.menu_store, self._all_restaurants
+        )
+
+        # structured filtering over the store's columns (row id == lexical doc id)
+        self.menu_filter = MenuFilter(self.menu_store)
+
+    def db_version(self) -> str:
+        # re-fingerprint the collections at most every version_check_interval seconds
+        now = time.monotonic()
+        if now - self._version_checked >= self.version_check_interval:
+            self._version = _digest(json.dumps(
+                collection_fingerprint(self.db_path, [self.res_col, self.menu_col]), sort_keys=True
+            ))
+            self._version_checked = now
+        return self._version
+
+    def _load_metadata(self, col, where: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        # page through the collection with get(): no embedding call, no ANN search, no result cap
+        ids: List[str] = []
+        rows: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = col.get(where=where, include=["metadatas"], limit=self.preload_batch_size, offset=offset)
+            ids.extend(page["ids"])
+            rows.extend(page["metadatas"])
+            if len(page["ids"]) < self.preload_batch_size:
+                return ids, rows
+            offset += self.preload_batch_size
+
+    def _preload(self) -> None:
+        _, self._all_restaurants = self._load_metadata(self.res_col, {"type": "restaurant"})
+        # menu items go into a columnar store; the page of dicts is dropped once it is encoded
+        self.menu_store = MenuStore(*self._load_metadata(self.menu_col, {"type": "menu_item"}))
+
+        # BM25 lexical indexes over the preloaded rows (doc id == position in _all_restaurants / row id)
+        self._res_index = BM25Index(
+            " ".join([r.get("name", ""), r.get("location", ""), r.get("cuisine", "")]) for r in self._all_restaurants
+        )
+        self._menu_index = BM25Index(" ".join([m.get("name", ""), m.get("category", "")]) for m in self.menu_store)
+
+    def save_snapshot(self) -> None:
+        res_table, res_arrays = self._res_index.state()
+        menu_table, menu_arrays = self._menu_index.state()
+        store_table, store_arrays = self.menu_store.state()
+        arrays = {f"res_index.{k}": v for k, v in res_arrays.items()}
+        arrays.update({f"menu_index.{k}": v for k, v in menu_arrays.items()})
+        arrays.update({f"menu_store.{k}": v for k, v in store_arrays.items()})
+        try:
+            save_snapshot(
+                self.snapshot_path,
+                self.fingerprint,
+                {
+                    "restaurants": self._all_restaurants,
+                    "menu_store": store_table,
+                    "res_index": res_table,
+                    "menu_index": menu_table,
+                },
+                arrays,
+            )
+        except OSError as e:
+            print(f"Could not write retriever snapshot {self.snapshot_path}: {e}")
+
+    @staticmethod
+    def _res_key(r: Dict[str, Any]) -> str:
+        return r.get("name", "")
+
+    @staticmethod
+    def _menu_key(m: MenuRow) -> str:
+        return f"{m.get('name','')}|{m.get('restaurant_name','')}"
+
+    def _inverted_search(
+        self,
+        index: BM25Index,
+        rows,
+        query: str,
+        k: int,
+        restaurant: Optional[str] = None,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Bucket:
+        if restaurant and candidates is None:
+            candidates = self.menu_store.where("restaurant_name", restaurant)
+        hits = index.search(query, k, candidates=candidates, min_score=self.min_lexical_score)
+        return [rows[d] for d, _ in hits], [score for _, score in hits], True
+
+    def _vector_search_many(
+        self,
+        col,
+        embeddings: List[np.ndarray],
+        k: int,
+        where: Dict[str, Any],
+        max_distance: Optional[float],
+        ids: Optional[List[str]] = None,
+    ) -> List[Bucket]:
+        # one Chroma round trip for all embeddings; the collection size comes from the preload
+        menu = col is self.menu_col
+        n = min(k, len(self.menu_store if menu else self._all_restaurants))
+        if ids is not None:
+            n = min(n, len(ids))  # search only the candidate ids a structured filter left
+        if n <= 0 or not embeddings:
+            return [([], [], False) for _ in embeddings]
+        # menu hits are mapped back to store rows by id, so Chroma need not return their metadata
+        res = col.query(
+            query_embeddings=list(embeddings),
+            n_results=n,
+            where=where,
+            ids=ids,
+            include=["distances"] if menu else ["metadatas", "distances"],
+        )
+        buckets: List[Bucket] = []
+        for i, dists in enumerate(res["distances"]):
+            if menu:
+                rows = self.menu_store.row_ids(res["ids"][i])
+                # ids added after the preload have no row yet; they show up after the next reload
+                pairs = [(self.menu_store[r], d) for r, d in zip(rows, dists) if r is not None]
+            else:
+                pairs = list(zip(res["metadatas"][i], dists))
+            hits = [(m, d) for m, d in pairs if max_distance is None or d <= max_distance]
+            buckets.append(([m for m, _ in hits], [d for _, d in hits], False))
+        return buckets
+
+    def _fuse(
+        self, buckets: List[Bucket], key, k: int, weights: Optional[List[float]]
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        return fuse_scores(buckets, key, k, method=self.fusion, weights=weights, min_score=self.min_score)
+
+    def resolve_restaurant(self, name: Optional[str]) -> Optional[str]:
+        return self._restaurant_names.get(name.strip().lower()) if name else None
+
+    def _restaurant_results(self, queries: List[str], k: int) -> List[List[Tuple[Dict[str, Any], float]]]:
+        embs = self.embeddings.embed(queries)
+        vecs = self._vector_search_many(self.res_col, embs, k, {"type": "restaurant"}, self.max_res_distance)
+        return [
+            self._fuse(
+                [vec, self._inverted_search(self._res_index, self._all_restaurants, q, k)],
+                self._res_key,
+                k,
+                self.res_fusion_weights,
+            )
+            for q, vec in zip(queries, vecs)
+        ]
+
+    def _menu_results(
+        self,
+        queries: List[str],
+        restaurants: List[Optional[str]],
+        categories: List[Optional[str]],
+        k: int,
+        constraints: Optional[List[Optional[Constraints]]] = None,
+    ) -> List[List[Tuple[MenuRow, float]]]:
+        results: List[List[Tuple[MenuRow, float]]] = [[] for _ in queries]
+        constraints = constraints or [None] * len(queries)
+
+        # Chroma takes one where-clause (or id list) per query() call, so group queries by
+        # restaurant filter and structured constraints; within a group the query and category
+        # texts all go through a single call
+        groups: Dict[Tuple[Optional[str], Optional[Constraints]], List[int]] = {}
+        for i, restaurant in enumerate(restaurants):
+            canonical = self.resolve_restaurant(restaurant)
+            if restaurant and not canonical:
+                continue  # unknown restaurant: nothing can match
+            groups.setdefault((canonical, constraints[i] or None), []).append(i)
+
+        for (canonical, constraint), idxs in groups.items():
+            where: Dict[str, Any] = {"type": "menu_item"}
+            candidates: Optional[np.ndarray] = None
+            ids: Optional[List[str]] = None
+            if constraint:
+                # structured filter first (NumPy masks over the preloaded rows), then the
+                # vector search runs on the surviving rows only
+                candidates = self.filter_candidates(constraint, canonical)
+                if not len(candidates):
+                    continue
+                ids = self.menu_store.chroma_ids(candidates)
+            elif canonical:
+                where = {"$and": [{"type": "menu_item"}, {"restaurant_name": canonical}]}
+            texts = [queries[i] for i in idxs] + [categories[i] for i in idxs if categories[i]]
+            buckets = self._vector_search_many(
+                self.menu_col, self.embeddings.embed(texts), k, where, self.max_menu_distance, ids
+            )
+            cat_pos = len(idxs)
+            for j, i in enumerate(idxs):
+                cat_hits: Bucket = ([], [], False)
+                if categories[i]:
+                    cat_hits = buckets[cat_pos]
+                    cat_pos += 1
+                inv = self._inverted_search(
+                    self._menu_index,
+                    self.menu_store,
+                    queries[i] + (f" {categories[i]}" if categories[i] else ""),
+                    k,
+                    canonical,
+                    candidates,
+                )
+                results[i] = self._fuse([buckets[j], cat_hits, inv], self._menu_key, k, self.menu_fusion_weights)
+        return results
+
+    def search_restaurants_scored(self, query: str, k: Optional[int] = None) -> List[Tuple[Dict[str, Any], float]]:
+        return self._restaurant_results([query], k or self.res_k)[0]
+
+    def search_menu_items_scored(
+        self,
+        query: str,
+        restaurant: Optional[str] = None,
+        category: Optional[str] = None,
+        k: Optional[int] = None,
+        constraints: Optional[Constraints] = None,
+    ) -> List[Tuple[MenuRow, float]]:
+        return self._menu_results([query], [restaurant], [category], k or self.menu_k, [constraints])[0]
+
+    def search_restaurants(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [r for r, _ in self.search_restaurants_scored(query, k)]
 
     def search_menu_items(
-        self, query: str, restaurant: Optional[str] = None, category: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        vec = self.menu_col.query(
-            query_texts=[query], n_results=len(self._all_menu), where={"type": "menu_item"}
-        )["metadatas"][0]
-        cat_hits = []
-        if category:
-            cat_hits = self.menu_col.query(
-                query_texts=[category], n_results=len(self._all_menu), where={"type": "menu_item"}
-            )["metadatas"][0]
-        inv = self._inverted_search(self._menu_index, query + (f" {category}" if category else ""))
-        combined, seen = [], set()
-        for bucket in (vec, cat_hits, inv):
-            for m in bucket:
-                key = f"{m.get('name','')}|{m.get('restaurant_name','')}"
-                if key not in seen and (not restaurant or m.get("restaurant_name","\"").lower() == restaurant.lower()):
-                    combined.append(m)
-                    seen.add(key)
-        return combined
+        self,
+        query: str,
+        restaurant: Optional[str] = None,
+        category: Optional[str] = None,
+        k: Optional[int] = None,
+        constraints: Optional[Constraints] = None,
+    ) -> List[MenuRow]:
+        return [m for m, _ in self.search_menu_items_scored(query, restaurant, category, k, constraints)]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        restaurants: Optional[List[Optional[str]]] = None,
+        categories: Optional[List[Optional[str]]] = None,
+        res_k: Optional[int] = None,
+        menu_k: Optional[int] = None,
+        constraints: Optional[List[Optional[Constraints]]] = None,
+    ) -> List[Dict[str, List[Tuple[Any, float]]]]:
+        """Search both collections for many queries at once.
+
+        All query texts are embedded in one batch and each collection is queried with one
+        vectorised call (one per distinct restaurant filter / constraint set for menu items).
+        Returns, per query, {"restaurants": [(meta, score), ...], "menu_items": [(MenuRow, score), ...]}.
+        """
+        restaurants = restaurants or [None] * len(queries)
+        categories = categories or [None] * len(queries)
+        if not queries:
+            return []
+        # warm the cache for every distinct text up front so the model runs once
+        self.embeddings.embed(list(queries) + [c for c in categories if c])
+        res = self._restaurant_results(list(queries), res_k or self.res_k)
+        menu = self._menu_results(
+            list(queries), list(restaurants), list(categories), menu_k or self.menu_k, constraints
+        )
+        return [{"restaurants": r, "menu_items": m} for r, m in zip(res, menu)]
 
     def list_all(self) -> List[Dict[str, Any]]:
         return self._all_restaurants
 
+    def restaurant_stats(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Stats rows for the given restaurant names (any case); unknown names are skipped."""
+        rows = []
+        for name in names:
+            canonical = self.resolve_restaurant(name)
+            if canonical in self.stats:
+                rows.append(self.stats[canonical])
+        return rows
+
+    def comparison_rows(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Stats rows for a "compare X and Y" / "X vs Y" question naming two or more restaurants, else None."""
+        if not is_comparison(query):
+            return None
+        rows = self.restaurant_stats(self.mentioned_restaurants(query))
+        return rows if len(rows) >= 2 else None
+
+    def parse_constraints(self, query: str) -> Constraints:
+        """Price bounds, veg status, course categories and named restaurants in a question.
+
+        Only names (full, or their first two words like "Moti Mahal") become a restaurant
+        filter: a first word alone ("barbeque chicken", "milan style food") is too weak a signal
+        to drop every other restaurant.
+        """
+        return self.menu_filter.parse(query, self.mentioned_restaurants(query, first_word=False))
+
+    def menu_query(self, query: str) -> Tuple[Optional[str], Optional[str], Constraints]:
+        """(restaurant, category, constraints) to search the menu items for a question with."""
+        restaurant, category = parse_query(query)
+        constraints = self.parse_constraints(query)
+        comparison = self.comparison_rows(query)
+        if comparison:
+            # "X vs Y" searches both sides, even when only one of them is named in full
+            constraints = constraints._replace(restaurants=tuple(row["name"] for row in comparison))
+        if constraints.restaurants:
+            restaurant = None  # the names matched against the known restaurants take precedence
+        elif restaurant and not self.resolve_restaurant(restaurant):
+            # a partial "at X" ("veg food at Milan"): resolve it like a mention, or drop it
+            names = self.mentioned_restaurants(restaurant)
+            restaurant = names[0] if names else None
+        return restaurant, category, constraints
+
+    def filter_candidates(self, constraints: Constraints, restaurant: Optional[str] = None) -> np.ndarray:
+        """Row ids (int64, ascending) of the menu items satisfying constraints, at restaurant if given."""
+        mask = self.menu_filter.mask(constraints)
+        canonical = self.resolve_restaurant(restaurant)
+        if canonical:
+            mask &= self.menu_filter.mask(Constraints(restaurants=(canonical,)))
+        return np.flatnonzero(mask).astype(np.int64)
+
+    def mentioned_restaurants(self, query: str, first_word: bool = True) -> List[str]:
+        """Restaurants named in the query, in mention order, by full name, by its first two words
+        or (if first_word) by a distinctive first word of four or more letters."""
+        q = query.lower()
+        found = []
+        for lower, name in self._restaurant_names.items():
+            words = lower.split()
+            first = words[0] if words else ""
+            m = (
+                re.search(re.escape(lower), q)
+                or (len(words) > 2 and re.search(rf"\b{re.escape(' '.join(words[:2]))}\b", q))
+                or (first_word and len(first) >= 4 and re.search(rf"\b{re.escape(first)}\b", q))
+            )
+            if m:
+                found.append((m.start(), name))
+        return [name for _, name in sorted(found)]
+
+
+def build_messages(query: str, context: str, history: str) -> List[Dict[str, str]]:
+    system_prompt = (
+        "You are Nuggets, a friendly, warm and knowledgeable local restaurant guide. "
+        "Domain: restaurants, menus, pricing, comparisons, dietary options.\n\n"
+        "1. Out-of-scope → Respond accordingly dont entertain questions beyond a restaurant guide.\n"
+        "2. Ambiguous → ask a concise clarifier.\n"
+        "3. No matches → “I couldn’t find a match—could you give me more details?”\n\n"
+        "Otherwise, use CONTEXT to craft a warm, accurate answer."
+    )
+    user_prompt = f"""{history.strip()}
+
+CONTEXT:
+{context.strip()}
+
+USER: {query.strip()}
+
+NUGGETS:"""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
 
 class Generator:
     def __init__(
@@ -96,26 +478,7 @@ class Generator:
         self.groq_model = groq_model
 
     def generate(self, query: str, context: str, history: str) -> str:
-        system_prompt = (
-            "You are Nuggets, a friendly, warm and knowledgeable local restaurant guide. "
-            "Domain: restaurants, menus, pricing, comparisons, dietary options.\n\n"
-            "1. Out-of-scope → Respond accordingly dont entertain questions beyond a restaurant guide.\n"
-            "2. Ambiguous → ask a concise clarifier.\n"
-            "3. No matches → “I couldn’t find a match—could you give me more details?”\n\n"
-            "Otherwise, use CONTEXT to craft a warm, accurate answer."
-        )
-        user_prompt = f"""{history.strip()}
-
-CONTEXT:
-{context.strip()}
-
-USER: {query.strip()}
-
-NUGGETS:"""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+        messages = build_messages(query, context, history)
         try:
             resp = self.client.chat.completions.create(
                 model=self.model, messages=messages, max_tokens=500
@@ -128,6 +491,89 @@ NUGGETS:"""
             )
             return fallback.choices[0].message.content
 
+    def generate_stream(self, query: str, context: str, history: str) -> Iterator[str]:
+        messages = build_messages(query, context, history)
+        emitted = False
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model, messages=messages, max_tokens=500, stream=True
+            )
+            for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    emitted = True
+                    yield token
+            return
+        except Exception as e:
+            # once tokens have reached the caller a restart on Groq would repeat them
+            if emitted:
+                raise
+            print(f"Hugging Face inference failed, falling back to Groq: {e}")
+        fallback = self.groq_client.chat.completions.create(
+            model=self.groq_model, messages=messages, max_tokens=500, stream=True
+        )
+        for chunk in fallback:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if token:
+                yield token
+
+
+def parse_query(query: str) -> Tuple[Optional[str], Optional[str]]:
+    rm = re.search(r"(?:at|for)\s+([A-Z][\w\s]+)", query)
+    cm = re.search(r"\b(desserts?|starters?|mains?|drinks?|beverages?)\b", query, re.IGNORECASE)
+    restaurant = rm.group(1).strip() if rm else None
+    category = cm.group(1).strip() if cm else None
+    return restaurant, category
+
+
+_COMPARISON = re.compile(r"\b(compare|comparison|vs|versus|better|difference|cheaper|costlier|pricier)\b", re.IGNORECASE)
+
+
+def is_comparison(query: str) -> bool:
+    return bool(_COMPARISON.search(query))
+
+
+def format_context(
+    restos: List[Dict[str, Any]],
+    items: List[MenuRow],
+    all_restaurants: List[Dict[str, Any]],
+    comparison: Optional[List[Dict[str, Any]]] = None,
+    constraints: Optional[Constraints] = None,
+    filter_empty: bool = False,
+) -> str:
+    lines: List[str] = []
+
+    if comparison:
+        lines += format_comparison(comparison).split("\n") + [""]
+    if constraints:
+        lines.append(f"MENU FILTER: {constraints.describe()}")
+        # only when the structured filter itself matched no rows, not when the search came back short
+        if filter_empty:
+            lines.append("No menu items match this filter.")
+
+    if restos:
+        lines.append("RESTAURANTS:")
+        lines += [f"- {r['name']} in {r.get('location','Unknown')} (Rating: {r.get('rating','N/A')})" for r in restos]
+    if items:
+        lines.append("\nMENU ITEMS:")
+        lines += [
+            f"- {m['name']} at {m.get('restaurant_name','Unknown')}, ₹{m.get('price','N/A')} ({m.get('veg_status','Unknown')})"
+            for m in items
+        ]
+    if not lines:
+        lines = ["AVAILABLE RESTAURANTS:"] + [
+            f"- {r['name']} in {r.get('location','Unknown')}" for r in all_restaurants
+        ]
+
+    return "\n".join(lines)
+
+
+def format_history(turns: List[Dict[str, str]]) -> str:
+    return "".join(
+        f"{'User: ' + m['input'] if 'input' in m else 'Nuggets: ' + m['output']}\n"
+        for m in turns
+    )
+
 
 class NuggetsBot:
     def __init__(
@@ -136,45 +582,70 @@ class NuggetsBot:
         db_path: str = "./public/restaurant_vector_db",
         groq_api_key: str = groq_fallback_key,
         groq_model: str = groq_fallback_model,
+        res_k: int = 5,
+        menu_k: int = 15,
+        answer_cache_size: int = 512,
+        answer_cache_ttl: float = 3600.0,
+        answer_cache_similarity: float = 0.95,
+        retriever: Optional[Retriever] = None,
+        max_history: int = 50,
     ):
-        self.retriever = Retriever(db_path)
+        self.retriever = retriever or Retriever(db_path, res_k=res_k, menu_k=menu_k)
         self.generator = Generator(api_key=api_key, groq_api_key=groq_api_key, groq_model=groq_model)
         self.chat_history: List[Dict[str, str]] = []
+        self.max_history = max_history
+        self.answer_cache = AnswerCache(
+            max_size=answer_cache_size, ttl=answer_cache_ttl, similarity=answer_cache_similarity
+        )
 
     def _build_context(self, query: str) -> str:
-        rm = re.search(r"(?:at|for)\s+([A-Z][\w\s]+)", query)
-        cm = re.search(r"\b(desserts?|starters?|mains?|drinks?|beverages?)\b", query, re.IGNORECASE)
-        restaurant = rm.group(1).strip() if rm else None
-        category = cm.group(1).strip() if cm else None
-
+        restaurant, category, constraints = self.retriever.menu_query(query)
         restos = self.retriever.search_restaurants(query)
-        items = self.retriever.search_menu_items(query, restaurant, category)
-        lines: List[str] = []
-
-        if restos:
-            lines.append("RESTAURANTS:")
-            lines += [f"- {r['name']} in {r.get('location','Unknown')} (Rating: {r.get('rating','N/A')})" for r in restos]
-        if items:
-            lines.append("\nMENU ITEMS:")
-            lines += [
-                f"- {m['name']} at {m.get('restaurant_name','Unknown')}, ₹{m.get('price','N/A')} ({m.get('veg_status','Unknown')})"
-                for m in items
-            ]
-        if not lines:
-            allr = self.retriever.list_all()
-            lines = ["AVAILABLE RESTAURANTS:"] + [
-                f"- {r['name']} in {r.get('location','Unknown')}" for r in allr
-            ]
-
-        return "\n".join(lines)
-
-    def process_query(self, query: str) -> str:
-        self.chat_history.append({"input": query})
-        history = "".join(
-            f"{'User: ' + m['input'] if 'input' in m else 'Nuggets: ' + m['output']}\n"
-            for m in self.chat_history[-3:]
+        items = self.retriever.search_menu_items(query, restaurant, category, constraints=constraints)
+        filter_empty = bool(constraints) and not len(self.retriever.filter_candidates(constraints, restaurant))
+        return format_context(
+            restos, items, self.retriever.list_all(), self.retriever.comparison_rows(query), constraints, filter_empty
         )
+
+    def _prepare(self, query: str, chat_history: List[Dict[str, str]]) -> Tuple[str, str, tuple, Optional[str]]:
+        chat_history.append({"input": query})
+        # only the last few turns reach the prompt, so keep the list bounded
+        del chat_history[:-self.max_history]
+        history = format_history(chat_history[-3:])
         ctx = self._build_context(query)
-        ans = self.generator.generate(query, ctx, history)
-        self.chat_history[-1]["output"] = ans
+
+        # answers are cached per (query, retrieved context, earlier turns in the window)
+        (emb,) = self.retriever.embeddings.embed([query])
+        cache_key = (
+            emb,
+            _digest(ctx),
+            _digest(format_history(chat_history[-3:-1])),
+            self.retriever.db_version(),
+        )
+        return history, ctx, cache_key, self.answer_cache.get(query, *cache_key)
+
+    def process_query(self, query: str, chat_history: Optional[List[Dict[str, str]]] = None) -> str:
+        chat_history = self.chat_history if chat_history is None else chat_history
+        history, ctx, cache_key, ans = self._prepare(query, chat_history)
+        if ans is None:
+            ans = self.generator.generate(query, ctx, history)
+            self.answer_cache.put(query, *cache_key, ans)
+        chat_history[-1]["output"] = ans
         return ans
+
+    def process_query_stream(
+        self, query: str, chat_history: Optional[List[Dict[str, str]]] = None
+    ) -> Iterator[str]:
+        chat_history = self.chat_history if chat_history is None else chat_history
+        history, ctx, cache_key, ans = self._prepare(query, chat_history)
+        if ans is not None:
+            chat_history[-1]["output"] = ans
+            yield ans
+            return
+        parts: List[str] = []
+        for token in self.generator.generate_stream(query, ctx, history):
+            parts.append(token)
+            yield token
+        ans = "".join(parts)
+        self.answer_cache.put(query, *cache_key, ans)
+        chat_history[-1]["output"] = ans
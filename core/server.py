@@ -0,0 +1,169 @@
+import json
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from core.rag_agent import NuggetsBot
+
+
+class SessionStore:
+    """Per-session chat histories, bounded in count and evicted after idle_ttl seconds.
+
+    Sessions are kept in least-recently-used order, so both idle eviction and the
+    max_sessions cap only ever pop from the front.
+    """
+
+    def __init__(self, max_sessions: int = 10_000, idle_ttl: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Tuple[List[Dict[str, str]], threading.Lock, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            sid, (_, _, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.idle_ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[sid]
+
+    def acquire(self, session_id: Optional[str]) -> Tuple[str, List[Dict[str, str]], threading.Lock]:
+        """Return (session_id, history, lock), creating the session if it is new or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            if session_id not in self._sessions:
+                session_id = session_id or uuid.uuid4().hex
+                self._sessions[session_id] = ([], threading.Lock(), now)
+            history, lock, _ = self._sessions[session_id]
+            self._sessions[session_id] = (history, lock, now)
+            self._sessions.move_to_end(session_id)
+            return session_id, history, lock
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._sessions)
+
+
+def make_handler(bot: NuggetsBot, sessions: SessionStore):
+    class ChatHandler(BaseHTTPRequestHandler):
+        # HTTP/1.1 for keep-alive and chunked streaming responses
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _write_chunk(self, text: str) -> None:
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {
+                    "status": "ok",
+                    "sessions": len(sessions),
+                    "answer_cache": {
+                        "hits": bot.answer_cache.hits,
+                        "semantic_hits": bot.answer_cache.semantic_hits,
+                        "misses": bot.answer_cache.misses,
+                    },
+                })
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_DELETE(self):
+            if self.path.startswith("/sessions/"):
+                found = sessions.drop(self.path[len("/sessions/"):])
+                self._send_json(200 if found else 404, {"deleted": found})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            path, _, query_string = self.path.partition("?")
+            if path != "/chat":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("body is not a JSON object")
+                message = payload["message"]
+            except (ValueError, KeyError) as e:
+                self._send_json(400, {"error": f"expected JSON body with a 'message' field ({e})"})
+                return
+            if not isinstance(message, str):
+                self._send_json(400, {"error": "'message' must be a string"})
+                return
+            message = message.strip()
+            if not message:
+                self._send_json(400, {"error": "empty message"})
+                return
+            if not isinstance(payload.get("session_id"), (str, type(None))):
+                self._send_json(400, {"error": "'session_id' must be a string"})
+                return
+
+            session_id, history, lock = sessions.acquire(payload.get("session_id"))
+            stream = payload.get("stream") or "stream=1" in query_string
+            # turns within one session are serialised; different sessions run concurrently
+            with lock:
+                if not stream:
+                    try:
+                        answer = bot.process_query(message, history)
+                    except Exception as e:
+                        self._send_json(500, {"error": str(e), "session_id": session_id})
+                        return
+                    self._send_json(200, {"session_id": session_id, "answer": answer})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("X-Session-Id", session_id)
+                self.end_headers()
+                try:
+                    for token in bot.process_query_stream(message, history):
+                        self._write_chunk(token)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                except Exception as e:
+                    self._write_chunk(f"\n[error] {e}")
+                self.wfile.write(b"0\r\n\r\n")
+
+    return ChatHandler
+
+
+def build_server(
+    bot: NuggetsBot,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    sessions: Optional[SessionStore] = None,
+    sock: Optional[socket.socket] = None,
+):
+    """ThreadingHTTPServer for bot; pass `sock` to serve on an inherited listening socket."""
+    handler = make_handler(bot, sessions or SessionStore())
+    if sock is None:
+        server = ThreadingHTTPServer((host, port), handler)
+    else:
+        server = ThreadingHTTPServer(sock.getsockname()[:2], handler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = sock
+    server.daemon_threads = True
+    return server
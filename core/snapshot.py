@@ -0,0 +1,106 @@
+import json
+import os
+import sqlite3
+import struct
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# On-disk layout (little endian):
+#   MAGIC | u32 version | u64 header length | JSON header | padding | raw arrays (64-byte aligned)
+# The JSON header carries the collection fingerprint, the metadata tables and, per array,
+# its dtype / shape / byte offset, so arrays can be memory-mapped straight out of the file.
+MAGIC = b"NUGSNAP\0"
+SNAPSHOT_VERSION = 3
+_ALIGN = 64
+
+
+def collection_fingerprint(db_path: str, collections: List[Any]) -> Dict[str, Any]:
+    """Identify the current state of the Chroma collections.
+
+    Collection ids and counts catch rebuilds and most edits; Chroma's per-segment
+    max_seq_id (bumped on every add / update / delete) catches in-place upserts.
+    """
+    fp: Dict[str, Any] = {col.name: [str(col.id), col.count()] for col in collections}
+    try:
+        con = sqlite3.connect(f"file:{os.path.join(db_path, 'chroma.sqlite3')}?mode=ro", uri=True)
+        try:
+            rows = con.execute("SELECT segment_id, seq_id FROM max_seq_id")
+            fp["max_seq_id"] = sorted([str(seg), int(seq)] for seg, seq in rows)
+        finally:
+            con.close()
+    except sqlite3.Error:
+        pass
+    return fp
+
+
+def save_snapshot(path: str, fingerprint: Dict[str, Any], tables: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+    specs: Dict[str, Any] = {}
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        offset = -(-offset // _ALIGN) * _ALIGN
+        specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    header = json.dumps(
+        {"fingerprint": fingerprint, "tables": tables, "arrays": specs}, ensure_ascii=False
+    ).encode("utf-8")
+    prefix = len(MAGIC) + 4 + 8 + len(header)
+    data_start = -(-prefix // _ALIGN) * _ALIGN
+
+    # write to a temp file and rename so readers never see a half-written snapshot
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<IQ", SNAPSHOT_VERSION, len(header)) + header)
+        f.write(b"\0" * (data_start - prefix))
+        for name, arr in arrays.items():
+            f.seek(data_start + specs[name]["offset"])
+            f.write(arr.tobytes())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, np.ndarray]]]:
+    """Return (fingerprint, tables, arrays) from path without validating it, or None if unreadable.
+
+    Arrays are read-only np.memmap views, so concurrent processes share the page cache.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            version, header_len = struct.unpack("<IQ", f.read(12))
+            if version != SNAPSHOT_VERSION:
+                return None
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        prefix = len(MAGIC) + 12 + header_len
+        data_start = -(-prefix // _ALIGN) * _ALIGN
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            shape = tuple(spec["shape"])
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=np.dtype(spec["dtype"]))
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=np.dtype(spec["dtype"]), mode="r", offset=data_start + spec["offset"], shape=shape
+                )
+        return header["fingerprint"], header["tables"], arrays
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+
+def load_snapshot(
+    path: str, fingerprint: Dict[str, Any]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """Return (tables, arrays) if path holds a current snapshot for fingerprint, else None."""
+    snap = read_snapshot(path)
+    if snap is None or not same_fingerprint(snap[0], fingerprint):
+        return None
+    return snap[1], snap[2]
+
+
+def same_fingerprint(stored: Dict[str, Any], current: Dict[str, Any]) -> bool:
+    # compare in JSON form: the stored copy has been through a JSON round trip (tuples -> lists)
+    return stored == json.loads(json.dumps(current))
@@ -0,0 +1,106 @@
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.snapshot import same_fingerprint
+
+STATS_FILENAME = "restaurant_stats.json"
+PERCENTILES = (25, 50, 75, 90)
+
+
+def stats_path(db_path: str) -> str:
+    return os.path.join(db_path, STATS_FILENAME)
+
+
+def compute_restaurant_stats(
+    menu_rows: List[Dict[str, Any]], restaurant_rows: Iterable[Dict[str, Any]] = ()
+) -> Dict[str, Dict[str, Any]]:
+    """Per-restaurant aggregates over menu item metadata, keyed by restaurant name.
+
+    Each entry has the restaurant's rating / location (when restaurant_rows are given), its
+    item count, price summary over priced items (min, percentiles, mean, max), veg and
+    non-veg shares of all items, and item counts per category.
+    """
+    info = {r.get("name", ""): r for r in restaurant_rows}
+    names = np.array([m.get("restaurant_name", "") for m in menu_rows], dtype=object)
+    prices = np.array([m.get("price") or 0 for m in menu_rows], dtype=np.float64)
+    veg = np.array([m.get("veg_status") == "veg" for m in menu_rows], dtype=bool)
+    non_veg = np.array([m.get("veg_status") == "non-veg" for m in menu_rows], dtype=bool)
+
+    stats: Dict[str, Dict[str, Any]] = {}
+    if len(menu_rows):
+        # group rows by restaurant with one sort instead of a scan per restaurant
+        uniq, codes = np.unique(names.astype(str), return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, bounds):
+            name = str(uniq[codes[group[0]]])
+            group_prices = prices[group]
+            priced = group_prices[group_prices > 0]
+            categories: Dict[str, int] = {}
+            for i in group:
+                category = menu_rows[i].get("category", "")
+                categories[category] = categories.get(category, 0) + 1
+            price = None
+            if len(priced):
+                pct = np.percentile(priced, PERCENTILES)
+                price = {"min": float(priced.min()), "max": float(priced.max()), "mean": round(float(priced.mean()), 2)}
+                price.update({f"p{p}": float(v) for p, v in zip(PERCENTILES, pct)})
+            stats[name] = {
+                "name": name,
+                "item_count": int(len(group)),
+                "priced_items": int(len(priced)),
+                "price": price,
+                "veg_share": round(float(veg[group].mean()), 4),
+                "non_veg_share": round(float(non_veg[group].mean()), 4),
+                "category_counts": categories,
+            }
+
+    for name, row in info.items():
+        entry = stats.setdefault(name, {
+            "name": name, "item_count": 0, "priced_items": 0, "price": None,
+            "veg_share": 0.0, "non_veg_share": 0.0, "category_counts": {},
+        })
+        entry["rating"] = row.get("rating")
+        entry["location"] = row.get("location")
+    return stats
+
+
+def save_stats(db_path: str, stats: Dict[str, Dict[str, Any]], fingerprint: Dict[str, Any]) -> None:
+    """Write the stats table next to the Chroma files, tagged with the collections' fingerprint."""
+    path = stats_path(db_path)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "restaurants": stats}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_stats(db_path: str, fingerprint: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """The stored stats table, or None if there is none or it was built for another DB state."""
+    try:
+        with open(stats_path(db_path), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if fingerprint is not None and not same_fingerprint(data.get("fingerprint"), fingerprint):
+        return None
+    return data.get("restaurants")
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = ["RESTAURANT COMPARISON:"]
+    for s in rows:
+        price = s.get("price")
+        price_text = (
+            f"prices ₹{price['min']:.0f}-₹{price['max']:.0f} (median ₹{price['p50']:.0f}, avg ₹{price['mean']:.0f})"
+            if price else "no prices listed"
+        )
+        top = sorted(s.get("category_counts", {}).items(), key=lambda kv: -kv[1])[:3]
+        lines.append(
+            f"- {s['name']}: rating {s.get('rating', 'N/A')}, {s['item_count']} items, {price_text}, "
+            f"{s['veg_share'] * 100:.0f}% veg, {s['non_veg_share'] * 100:.0f}% non-veg"
+            + (f"; biggest categories: {', '.join(f'{c} ({n})' for c, n in top)}" if top else "")
+        )
+    return "\n".join(lines)
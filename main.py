@@ -2,6 +2,7 @@ import os
 from dotenv import load_dotenv, set_key
 from core.rag_agent import NuggetsBot
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.text import Text
@@ -33,8 +34,13 @@ def main():
                 console.print("[bold magenta]Goodbye![/bold magenta]")
                 break
 
-            response = bot.process_query(query)
-            console.print(Panel(Text(response), title="Nuggets", subtitle="🍔", style="blue"))
+            # render tokens as they arrive instead of waiting for the full completion
+            response = Text()
+            panel = Panel(response, title="Nuggets", subtitle="🍔", style="blue")
+            with Live(panel, console=console, refresh_per_second=15) as live:
+                for chunk in bot.process_query_stream(query):
+                    response.append(chunk)
+                    live.update(panel)
         except KeyboardInterrupt:
             console.print("\n[bold magenta]Session terminated by user. Goodbye![/bold magenta]")
             break
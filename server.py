@@ -0,0 +1,62 @@
+import argparse
+import os
+import socket
+from dotenv import load_dotenv
+from core.rag_agent import NuggetsBot, Retriever, default_snapshot_path
+from core.prefork import PreforkSupervisor, build_snapshot
+from core.server import SessionStore, build_server
+from core.snapshot import read_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nuggets Bot HTTP chat server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db-path", default="./public/restaurant_vector_db")
+    parser.add_argument("--max-sessions", type=int, default=10_000)
+    parser.add_argument("--idle-ttl", type=float, default=1800.0, help="seconds before an idle session is dropped")
+    parser.add_argument("--workers", type=int, default=1, help="pre-forked worker processes sharing the loaded state")
+    args = parser.parse_args()
+
+    load_dotenv('.env')
+    token = os.getenv("HUGGING_FACE_TOKEN")
+    if not token:
+        raise SystemExit("HUGGING_FACE_TOKEN is not set (add it to .env or run main.py once to save it)")
+
+    if args.workers > 1:
+        serve_prefork(args, token)
+        return
+
+    # one bot (and so one Retriever / embedding model) shared by every session in the process
+    bot = NuggetsBot(api_key=token, db_path=args.db_path)
+    sessions = SessionStore(max_sessions=args.max_sessions, idle_ttl=args.idle_ttl)
+    server = build_server(bot, args.host, args.port, sessions)
+    print(f"Nuggets server listening on http://{args.host}:{args.port}  (POST /chat, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve_prefork(args, token: str):
+    # the parent never opens Chroma (not fork-safe): a throwaway child refreshes the
+    # snapshot, the parent maps it once and every worker inherits it copy-on-write
+    build_snapshot(args.db_path)
+    shared = read_snapshot(default_snapshot_path(args.db_path))
+    sock = socket.create_server((args.host, args.port), backlog=256)
+
+    def worker_main(sock):
+        retriever = Retriever(args.db_path, shared_state=shared)
+        bot = NuggetsBot(api_key=token, retriever=retriever)
+        # sessions live in the worker, so a load balancer should pin a session to one worker
+        sessions = SessionStore(max_sessions=args.max_sessions, idle_ttl=args.idle_ttl)
+        build_server(bot, sessions=sessions, sock=sock).serve_forever()
+
+    print(f"Nuggets server listening on http://{args.host}:{args.port} with {args.workers} workers")
+    PreforkSupervisor(sock, worker_main, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()